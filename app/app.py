@@ -1,12 +1,26 @@
 import streamlit as st
-import joblib
 import pandas as pd
 import numpy as np
-import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import os
+import sys
 import math
+import hashlib
+
+sys.path.append(os.getcwd())
+from utils import store
+from utils.dataset import dataset_version
+from utils.export import (EXPORT_MAX_BYTES, FORMATS, available_formats, export as export_rows,
+                          new_export_path)
+from utils.paging import PAGE_SIZES, page_count, page_slice, severity, take
+from utils.scenarios import sweep, what_if
+from utils.scoring import RISK_TIERS
+from utils import charts, figcache, model_cache, perf, predict_cache
+from utils.figcache import cached_png
+from utils.binned import HGB_PARAMS, BinnedData, get_binned
+from utils.jobs import TrainJob
+from utils.predict_cache import CachedModel
 
 # ─── Page Config ────────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -188,23 +202,123 @@ _defaults = {
     'custom_params':     None,
     'custom_df':         None,
     '_feat_cache_key':   None,
+    '_train_job':        None,
+    '_train_error':      None,
+    '_export':           None,
 }
 for _key, _val in _defaults.items():
     if _key not in st.session_state:
         st.session_state[_key] = _val
 
+# Per-rerun section timings (utils/perf.py); finished at the bottom of the script
+perf.begin_run()
+
 # ... Imports (st, pd, joblib, etc.)
 
 # 1. LOAD DATA AT THE TOP (Global Scope)
-# This ensures df_raw is available to EVERY part of the app
-@st.cache_data
-def load_global_data():
-    return pd.read_csv('data/StudentPerformanceFactors.csv')
-
-df_raw = load_global_data()
+# Only the columns the Student Portal needs; the dashboard loads the full frame.
+# utils.store keeps one copy per dataset version for the whole process, so
+# reruns reuse the same objects instead of re-reading or unpickling anything.
+PORTAL_COLS = ['Name', 'Gender', 'Attendance', 'Exam_Score', 'Hours_Studied', 'Motivation_Level']
+
+df_raw = store.get_dataset(PORTAL_COLS)
+
+# ─── Helpers ─────────────────────────────────────────────────────────────────────
+def page_controls(total, key):
+    """Rows-per-page + page-number widgets for a paginated table; returns (page, page_size)."""
+    pc1, pc2, pc3 = st.columns([1, 1, 2])
+    with pc1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    n_pages = page_count(total, page_size)
+    with pc2:
+        # Keyed on the page count so a new filter result starts back on page 1
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1,
+                               key=f"{key}_page_{n_pages}")
+    with pc3:
+        st.markdown(
+            f"<div style='color:#64748b; font-size:0.8rem; padding-top:34px;'>"
+            f"Page {page} of {n_pages:,} · {total:,} rows</div>",
+            unsafe_allow_html=True
+        )
+    return int(page), page_size
+
+
+def perf_panel():
+    """Admin-only timings of recent reruns and cache counters (utils/perf.py)."""
+    with st.expander("⚡ Performance", expanded=False):
+        perf.set_enabled(st.toggle("Record timings (all sessions)", value=perf.enabled(), key="perf_enabled"))
+        recorded = perf.runs()
+        if not recorded:
+            st.caption("No reruns recorded yet.")
+            return
+        last = recorded[-1]
+        st.caption(f"Last run ({last['label']}): **{last['total_ms']:.0f} ms** · RSS {last['rss_mb']:.0f} MB "
+                   f"({last['rss_delta_mb']:+.1f} MB) · {len(recorded)} reruns buffered")
+        if last['spans']:
+            spans = pd.DataFrame(last['spans'])
+            spans['name'] = ['· ' * d + n for d, n in zip(spans['depth'], spans['name'])]
+            st.dataframe(spans[['name', 'ms', 'rss_delta_mb']].round(2), hide_index=True,
+                         use_container_width=True)
+        st.markdown("<div style='color:#64748b; font-size:0.75rem;'>All buffered reruns (ms)</div>",
+                    unsafe_allow_html=True)
+        st.dataframe(pd.DataFrame(perf.span_stats()).T.round(1), use_container_width=True)
+        st.caption(f"Charts {figcache.stats()} · Predictions {predict_cache.stats()} · "
+                   f"Custom models {model_cache.stats()}")
+        d1, d2 = st.columns(2)
+        if d1.button("Dump JSONL", key="perf_jsonl"):
+            st.success(f"{perf.dump_jsonl()} reruns → {perf.JSONL_PATH}")
+        if d2.button("Dump Prometheus", key="perf_prom"):
+            st.success(f"Written {perf.dump_prometheus()}")
+
+
+def finish_run():
+    """Close this rerun's timings; admins also get the Performance panel in the sidebar."""
+    perf.end_run()
+    if st.session_state.get('role') == 'admin':
+        with st.sidebar:
+            perf_panel()
+
+
+def cancel_training():
+    job = st.session_state.get('_train_job')
+    if job is not None:
+        job.cancel()
+    st.session_state['_train_job'] = None
+
+
+def activate_custom(model, key, info):
+    """Swap model + params in together so the estimator never sees a mismatched pair."""
+    st.session_state.update({
+        'custom_model':      model,
+        'custom_params':     info,
+        'custom_df':         info['merged_df'],
+        '_feat_cache_key':   key,
+        'prediction_result': None,   # reset stale result
+    })
+
+
+@st.fragment(run_every=0.5)
+def training_status():
+    """Poll the background custom-model fit; swap the new model in once it is done.
+
+    Only the fragment reruns while polling, so the rest of the page stays
+    usable (and keeps predicting with the previous model) during the fit.
+    """
+    job = st.session_state.get('_train_job')
+    if job is None:
+        return
+    if job.status == 'done':
+        model_cache.put(job.key, job.model)   # shared with every other session
+        activate_custom(job.model, job.key, job.meta)
+    elif job.status in ('failed', 'cancelled'):
+        # Shown once by the next full rerun, which no longer renders this poller
+        st.session_state['_train_error'] = str(job.error) if job.status == 'failed' else None
+    else:
+        st.progress(job.progress, text=f"⏳ Training on {len(job.meta['features'])} features… {job.progress:.0%}")
+        return
+    st.session_state['_train_job'] = None
+    st.rerun(scope="app")
 
-# 2. LOAD MODEL
-model = joblib.load('model/model.pkl')
 
 # ─── Sidebar ─────────────────────────────────────────────────────────────────────
 with st.sidebar:
@@ -294,14 +408,15 @@ if st.session_state.get('portal_view', False):
     """, unsafe_allow_html=True)
 
     # ── KPIs ──
+    # Pre-sorted attendance index (utils/attendance_index.py): counts and
+    # range selections are searchsorted slices, no frame scans or copies.
     threshold = 75
-    defaulters_df = df_raw[df_raw['Attendance'] < threshold].copy().reset_index()
-    defaulters_df.rename(columns={'index': 'student_id'}, inplace=True)
-    defaulters_df['student_id'] = defaulters_df['student_id'] + 1  # 1-indexed
+    att_index = store.get_attendance_index()
+    scores    = store.get_scores()   # persisted cohort predictions (None until a model is trained)
 
     total_students = len(df_raw)
-    n_defaulters   = len(defaulters_df)
-    avg_def_att    = defaulters_df['Attendance'].mean() if n_defaulters > 0 else 0
+    n_defaulters   = att_index.count(below=threshold)
+    avg_def_att    = att_index.mean_attendance(below=threshold)
 
     pk1, pk2, pk3 = st.columns(3)
     pk1.metric("🎓 Total Students",      f"{total_students:,}")
@@ -312,7 +427,7 @@ if st.session_state.get('portal_view', False):
 
     # ── Filters ──
     st.markdown("<div class='section-header'>🔍 Search & Filter</div>", unsafe_allow_html=True)
-    fc1, fc2, fc3, fc4, fc5 = st.columns([1.4, 1, 1, 1, 1])
+    fc1, fc2, fc3, fc4, fc5, fc6 = st.columns([1.4, 1, 1, 1, 1, 1])
 
     with fc1:
         search_query = st.text_input(
@@ -322,111 +437,158 @@ if st.session_state.get('portal_view', False):
             label_visibility="visible"
         )
     with fc2:
-        gender_opts = ["All"] + sorted(df_raw['Gender'].dropna().unique().tolist())
+        gender_opts = ["All"] + att_index.genders
         filter_gender = st.selectbox("Gender", gender_opts)
     with fc3:
         att_max = st.slider("Max Attendance %", 40, 74, 74)
     with fc4:
-        sort_by = st.selectbox("Sort By", ["Attendance ↑ (worst first)", "Attendance ↓", "Exam Score ↑", "Exam Score ↓"])
+        sort_opts = ["Attendance ↑ (worst first)", "Attendance ↓", "Exam Score ↑", "Exam Score ↓"]
+        if scores is not None:
+            sort_opts += ["Predicted Score ↑", "Predicted Score ↓"]
+        sort_by = st.selectbox("Sort By", sort_opts)
     with fc5:
+        risk_filter = st.selectbox("Predicted Risk", ["All"] + RISK_TIERS, disabled=scores is None,
+                                   help="Risk tier from the model's predicted score (scored once per dataset)")
+    with fc6:
         show_all = st.checkbox("Show all students", value=False,
                                help="When checked, shows the full student list — not just defaulters")
 
-    # Build base dataframe — defaulters only OR all students
-    base_df = df_raw.copy().reset_index()
-    base_df.rename(columns={'index': 'student_id'}, inplace=True)
-    base_df['student_id'] = base_df['student_id'] + 1
-
     # Detect whether the loaded CSV has a Name column
-    HAS_NAME = 'Name' in base_df.columns
+    HAS_NAME = 'Name' in df_raw.columns
 
-    if not show_all:
-        filtered = base_df[base_df['Attendance'] < 75].copy()
-        filtered = filtered[filtered['Attendance'] <= att_max]
-    else:
-        filtered = base_df[base_df['Attendance'] <= att_max].copy()
+    sort_map = {
+        "Attendance ↑ (worst first)": ('Attendance', True),
+        "Attendance ↓": ('Attendance', False),
+        "Exam Score ↑": ('Exam_Score', True),
+        "Exam Score ↓": ('Exam_Score', False),
+        "Predicted Score ↑": ('Predicted_Score', True),
+        "Predicted Score ↓": ('Predicted_Score', False),
+    }
+    sort_col, sort_asc = sort_map[sort_by]
 
-    if filter_gender != "All":
-        filtered = filtered[filtered['Gender'] == filter_gender]
+    # Row ids (0-based positions) of defaulters only OR all students, already sorted
+    with perf.span('portal:filter'):
+        ids = att_index.select(att_max=att_max, below=None if show_all else threshold, gender=filter_gender,
+                               order=None if sort_col == 'Predicted_Score' else sort_col, ascending=sort_asc)
+        if scores is not None:
+            if risk_filter != "All":
+                ids = ids[scores['Risk_Tier'].cat.codes.to_numpy()[ids] == RISK_TIERS.index(risk_filter)]
+            if sort_col == 'Predicted_Score':
+                order = np.argsort(scores['Predicted_Score'].to_numpy()[ids], kind='stable')
+                ids = ids[order] if sort_asc else ids[order[::-1]]
 
     # Smart search — detect if query is numeric (ID) or text (name)
     query = search_query.strip()
     search_matched = False
     if query:
         if query.isdigit():
-            # Search by exact Student ID
-            id_result = filtered[filtered['student_id'] == int(query)]
+            # Search by exact Student ID (IDs are 1-indexed row positions)
+            id_result = ids[ids == int(query) - 1]
             if len(id_result) > 0:
-                filtered = id_result
+                ids = id_result
                 search_matched = True
             else:
                 st.warning(f"No student found with ID **{query}** in the current filtered list.")
-                filtered = filtered.iloc[0:0]
+                ids = ids[:0]
         else:
             # Search by name — only if Name column exists in the CSV
             if HAS_NAME:
-                name_result = filtered[filtered['Name'].str.contains(query, case=False, na=False)]
+                # Indexed lookup (utils/name_index.py); isin keeps the sort order
+                name_index = store.get_name_index()
+                name_result = ids[np.isin(ids, name_index.search(query))]
                 if len(name_result) > 0:
-                    filtered = name_result
+                    ids = name_result
                     search_matched = True
                 else:
-                    st.warning(f"No student found matching **\"{query}\"**. Try a partial name or check spelling.")
-                    filtered = filtered.iloc[0:0]
+                    close = name_index.fuzzy(query)
+                    close_rows = np.concatenate([rows for _, _, rows in close]) if close else []
+                    fuzzy_result = ids[np.isin(ids, close_rows)]
+                    if len(fuzzy_result) > 0:
+                        suggestions = ", ".join(f"**{n}** ({s:.0%})" for n, s, _ in close)
+                        st.info(f"No exact match for **\"{query}\"** — showing closest names: {suggestions}")
+                        ids = fuzzy_result
+                        search_matched = True
+                    else:
+                        st.warning(f"No student found matching **\"{query}\"**. Try a partial name or check spelling.")
+                        ids = ids[:0]
             else:
                 st.error("⚠️ Name search unavailable — your CSV does not have a **Name** column. "
                          "Please replace `data/StudentPerformanceFactors.csv` with the updated file that includes names, then restart the app.")
-                filtered = filtered.iloc[0:0]
+                ids = ids[:0]
 
-    sort_map = {
-        "Attendance ↑ (worst first)": ('Attendance', True),
-        "Attendance ↓": ('Attendance', False),
-        "Exam Score ↑": ('Exam_Score', True),
-        "Exam Score ↓": ('Exam_Score', False),
-    }
-    sort_col, sort_asc = sort_map[sort_by]
-    filtered = filtered.sort_values(sort_col, ascending=sort_asc).reset_index(drop=True)
-
-    # Result count label
+    # Result count label (the count comes straight from the id array)
     list_label = "students" if show_all else "defaulters"
     match_note = f" matching <b style='color:#4f8ef7;'>'{query}'</b>" if query and search_matched else ""
     st.markdown(
         f"<div style='color:#64748b; font-size:0.85rem; margin-bottom:8px;'>"
-        f"Showing <b style='color:#f87171;'>{len(filtered)}</b> {list_label}{match_note}</div>",
+        f"Showing <b style='color:#f87171;'>{len(ids)}</b> {list_label}{match_note}</div>",
         unsafe_allow_html=True
     )
 
     # ── Defaulters Table ──
     st.markdown("<div class='section-header'>📋 Defaulters List</div>", unsafe_allow_html=True)
 
-    def severity_badge(att):
-        if att < 60:
-            return "🔴 Critical"
-        elif att < 65:
-            return "🟠 High Risk"
-        elif att < 75:
-            return "🟡 At Risk"
-        else:
-            return "🟢 OK"
-
-    has_name = 'Name' in filtered.columns
-    cols_to_show = ['student_id'] + (['Name'] if has_name else []) + ['Gender', 'Attendance', 'Exam_Score', 'Hours_Studied', 'Motivation_Level']
-    cols_to_show = [c for c in cols_to_show if c in filtered.columns]
-
-    display_df = filtered[cols_to_show].copy()
+    cols_to_show = (['Name'] if HAS_NAME else []) + ['Gender', 'Attendance', 'Exam_Score', 'Hours_Studied', 'Motivation_Level']
+    cols_to_show = [c for c in cols_to_show if c in df_raw.columns]
     rename_map = {
         'student_id': 'ID', 'Name': 'Name', 'Gender': 'Gender',
         'Attendance': 'Attendance %', 'Exam_Score': 'Exam Score',
         'Hours_Studied': 'Hours Studied/Week', 'Motivation_Level': 'Motivation'
     }
-    display_df.rename(columns={k: v for k, v in rename_map.items() if k in display_df.columns}, inplace=True)
-    display_df['Status'] = display_df['Attendance %'].apply(severity_badge)
+
+    def display_rows(row_ids):
+        """Display frame (ID, renamed columns, status badge) for just `row_ids`."""
+        out = take(df_raw, row_ids, cols_to_show)
+        out.insert(0, 'student_id', np.asarray(row_ids) + 1)
+        out.rename(columns=rename_map, inplace=True)
+        out['Status'] = severity(out['Attendance %'])
+        if scores is not None:
+            out['Predicted Score'] = scores['Predicted_Score'].to_numpy()[row_ids].round(1)
+            out['Predicted Risk']  = scores['Risk_Tier'].to_numpy()[row_ids]
+        return out
+
+    # Only the visible page is materialized and sent to the browser
+    page, page_size = page_controls(len(ids), key="portal")
+    display_df = display_rows(page_slice(ids, page, page_size))
 
     st.dataframe(display_df, use_container_width=True, height=340, hide_index=True)
 
     # ── Download button ──
-    csv_export = display_df.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇️ Download List (CSV)", csv_export,
-                       file_name="defaulters_list.csv", mime="text/csv")
+    # The file is only generated when asked for, streamed chunk by chunk from
+    # the id array into a file under data/.cache/exports (utils/export.py), and
+    # reused until the filters change. Files older than an hour are pruned.
+    # Serving it still loads the whole file into memory (Streamlit's media store),
+    # so exports above EXPORT_MAX_BYTES are refused.
+    dl1, dl2 = st.columns([1, 3])
+    with dl1:
+        export_fmt = st.selectbox("Export format", available_formats(), label_visibility="collapsed")
+    export_sig = (dataset_version(), show_all, att_max, filter_gender, sort_by, risk_filter, query, export_fmt)
+    prepared   = st.session_state.get('_export')
+    with dl2:
+        if prepared and prepared['sig'] == export_sig and os.path.exists(prepared['path']):
+            with open(prepared['path'], 'rb') as f:
+                st.download_button(f"⬇️ Download List ({export_fmt})", f,
+                                   file_name=prepared['file_name'], mime=prepared['mime'])
+        elif st.button(f"📦 Prepare Download ({len(ids):,} rows)"):
+            ext, mime = FORMATS[export_fmt]
+            if prepared and os.path.exists(prepared['path']):
+                os.remove(prepared['path'])
+            export_path = new_export_path(ext)
+            export_rows(display_rows, ids, export_fmt, export_path)
+            export_size = os.path.getsize(export_path)
+            if export_size > EXPORT_MAX_BYTES:
+                os.remove(export_path)
+                st.session_state['_export'] = None
+                st.warning(f"This export is {export_size / 1e6:,.0f} MB, above the "
+                           f"{EXPORT_MAX_BYTES / 1e6:,.0f} MB browser-download limit. Narrow the filters, "
+                           f"choose CSV (gzip) or Parquet, or use `python model/score_students.py` for a "
+                           f"full-cohort file.")
+            else:
+                st.session_state['_export'] = {
+                    'sig': export_sig, 'path': export_path,
+                    'file_name': f"defaulters_list.{ext}", 'mime': mime,
+                }
+                st.rerun()
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -708,6 +870,7 @@ if st.session_state.get('portal_view', False):
         st.session_state['portal_view'] = False
         st.rerun()
 
+    finish_run()
     st.stop()   # Don't render rest of app
 
 
@@ -748,17 +911,19 @@ if not st.session_state['logged_in']:
 
 # ─── MAIN DASHBOARD ──────────────────────────────────────────────────────────────
 else:
-    # Load data & model
-    @st.cache_data
-    def load_data():
-        return pd.read_csv('data/StudentPerformanceFactors.csv')
-
-    @st.cache_resource
-    def load_model():
-        return joblib.load('model/model.pkl')
-
-    df_raw = load_data()
-    model  = load_model()
+    # Load data & model (shared process-wide, see utils/store.py)
+    with perf.span('dashboard:load'):
+        df_raw  = store.get_dataset()
+        preprocessor = store.get_preprocessor()
+        # Precomputed lookup grid if trained with --grid (a coarse one only within
+        # GRID_TOLERANCE of the model), else the compiled flat-array forest (same
+        # predictions as the pickle, far lower single-row latency).
+        # The full pickle is only unpickled when neither is available.
+        grid_model = store.get_grid_model()
+        fast_model = grid_model or store.get_flat_model() or store.get_model()
+        # A coarse grid interpolates, so its memoized predictions are kept apart
+        fast_version = store.model_version() + (f":grid{grid_model.step}" if grid_model is not None else '')
+        summary = store.get_summary()
 
     # ── Header ──
     st.markdown("""
@@ -767,12 +932,12 @@ else:
     <br>
     """, unsafe_allow_html=True)
 
-    # ── Top KPIs ──
-    avg_att   = df_raw['Attendance'].mean()
-    avg_score = df_raw['Exam_Score'].mean()
-    corr_val  = df_raw[['Attendance', 'Exam_Score']].corr().iloc[0, 1]
-    total_stu = len(df_raw)
-    at_risk   = len(df_raw[df_raw['Attendance'] < 75])
+    # ── Top KPIs (from the precomputed snapshot, see utils/summary.py) ──
+    avg_att   = summary['avg_att']
+    avg_score = summary['avg_score']
+    corr_val  = summary['corr']
+    total_stu = summary['total']
+    at_risk   = summary['at_risk']
 
     k1, k2, k3, k4, k5 = st.columns(5)
     k1.metric("📊 Total Students",   f"{total_stu:,}")
@@ -783,6 +948,12 @@ else:
 
     st.markdown("<br>", unsafe_allow_html=True)
 
+    def show_chart(chart_id, draw):
+        """Summary-driven chart served as cached PNG bytes (utils/figcache.py)."""
+        with perf.span(f"chart:{chart_id}"):
+            png = cached_png((summary['version'], chart_id), lambda: draw(summary))
+            st.image(png, use_container_width=True)
+
     # ── Tabs ──
     tab1, tab2, tab3 = st.tabs(["📈 Correlation Analysis", "🤖 Grade Estimator", "📊 Data Explorer"])
 
@@ -790,40 +961,15 @@ else:
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # TAB 1 — CORRELATION ANALYSIS
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    with tab1:
+    @st.fragment
+    @perf.fragment('correlation')
+    def correlation_tab():
         st.markdown("<br>", unsafe_allow_html=True)
         c1, c2 = st.columns([1.4, 1], gap="large")
 
         with c1:
             st.markdown("<div class='section-header'>Attendance vs Exam Score — Trend Line</div>", unsafe_allow_html=True)
-            sample = df_raw.sample(800, random_state=42)
-
-            fig, ax = plt.subplots(figsize=(9, 5), facecolor='#1a1e2b')
-            ax.set_facecolor('#1a1e2b')
-
-            ax.scatter(sample['Attendance'], sample['Exam_Score'],
-                       alpha=0.25, s=18, color='#4f8ef7', linewidths=0)
-
-            # Trend line
-            z = np.polyfit(sample['Attendance'], sample['Exam_Score'], 1)
-            p = np.poly1d(z)
-            x_line = np.linspace(sample['Attendance'].min(), sample['Attendance'].max(), 200)
-            ax.plot(x_line, p(x_line), color='#a78bfa', linewidth=2.5, label='Trend Line')
-
-            # 75% threshold line
-            ax.axvline(75, color='#f87171', linewidth=1.5, linestyle='--', alpha=0.7, label='75% Attendance Threshold')
-
-            ax.set_xlabel('Attendance (%)', color='#64748b', fontsize=11)
-            ax.set_ylabel('Exam Score', color='#64748b', fontsize=11)
-            ax.set_title('', color='#e2e8f0')
-            ax.tick_params(colors='#64748b')
-            for spine in ax.spines.values(): spine.set_edgecolor('#252a3a')
-            ax.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=10)
-            ax.grid(True, alpha=0.08, color='white')
-
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
+            show_chart('trend', charts.trend)
 
         with c2:
             st.markdown("<div class='section-header'>Statistical Summary</div>", unsafe_allow_html=True)
@@ -838,52 +984,18 @@ else:
             """, unsafe_allow_html=True)
 
             # Attendance buckets
-            bins_label = ['<60%', '60–75%', '75–85%', '85–100%']
-            bins_cut   = pd.cut(df_raw['Attendance'], bins=[0, 60, 75, 85, 100])
-            group_means = df_raw.groupby(bins_cut, observed=True)['Exam_Score'].mean().values
-
             st.markdown("<div class='section-header' style='margin-top:16px;'>Avg Score by Attendance Band</div>", unsafe_allow_html=True)
-            colors_bar = ['#f87171', '#fb923c', '#facc15', '#34d399']
-            fig2, ax2 = plt.subplots(figsize=(5, 2.8), facecolor='#1a1e2b')
-            ax2.set_facecolor('#1a1e2b')
-            bars = ax2.bar(bins_label, group_means, color=colors_bar, width=0.55, edgecolor='none', zorder=3)
-            for bar, val in zip(bars, group_means):
-                ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.3,
-                         f'{val:.1f}', ha='center', va='bottom', color='#e2e8f0', fontsize=9)
-            ax2.set_ylabel('Avg Score', color='#64748b', fontsize=9)
-            ax2.tick_params(colors='#64748b', labelsize=8)
-            for spine in ax2.spines.values(): spine.set_edgecolor('#252a3a')
-            ax2.grid(axis='y', alpha=0.08, color='white', zorder=0)
-            ax2.set_ylim(0, max(group_means) + 8)
-            plt.tight_layout()
-            st.pyplot(fig2)
-            plt.close()
+            show_chart('band_means', charts.band_means)
 
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown("<div class='section-header'>Distribution Analysis</div>", unsafe_allow_html=True)
         d1, d2, d3 = st.columns(3)
 
         with d1:
-            fig3, ax3 = plt.subplots(figsize=(4.5, 3), facecolor='#1a1e2b')
-            ax3.set_facecolor('#1a1e2b')
-            ax3.hist(df_raw['Attendance'], bins=30, color='#4f8ef7', alpha=0.8, edgecolor='none')
-            ax3.axvline(75, color='#f87171', linewidth=1.5, linestyle='--', label='75% line')
-            ax3.set_title('Attendance Distribution', color='#e2e8f0', fontsize=11)
-            ax3.tick_params(colors='#64748b', labelsize=8)
-            for spine in ax3.spines.values(): spine.set_edgecolor('#252a3a')
-            ax3.grid(alpha=0.07, color='white')
-            ax3.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=8)
-            plt.tight_layout(); st.pyplot(fig3); plt.close()
+            show_chart('attendance_hist', charts.attendance_hist)
 
         with d2:
-            fig4, ax4 = plt.subplots(figsize=(4.5, 3), facecolor='#1a1e2b')
-            ax4.set_facecolor('#1a1e2b')
-            ax4.hist(df_raw['Exam_Score'], bins=30, color='#a78bfa', alpha=0.8, edgecolor='none')
-            ax4.set_title('Exam Score Distribution', color='#e2e8f0', fontsize=11)
-            ax4.tick_params(colors='#64748b', labelsize=8)
-            for spine in ax4.spines.values(): spine.set_edgecolor('#252a3a')
-            ax4.grid(alpha=0.07, color='white')
-            plt.tight_layout(); st.pyplot(fig4); plt.close()
+            show_chart('score_hist', charts.score_hist)
 
         # with d3:
         #     fig5, ax5 = plt.subplots(figsize=(4.5, 3), facecolor='#1a1e2b')
@@ -903,18 +1015,19 @@ else:
         #     ax5.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=8)
         #     plt.tight_layout(); st.pyplot(fig5); plt.close()
 
+    with tab1:
+        correlation_tab()
+
 
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # TAB 2 — GRADE ESTIMATOR
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    with tab2:
+    @st.fragment
+    @perf.fragment('custom')
+    def custom_panel():
+        model_changed = False   # a different model is now active / training
         st.markdown("<br>", unsafe_allow_html=True)
 
-        # ── Initial resolve (may be overridden after expander retraining) ───────
-        _active_model  = st.session_state.get('custom_model') or model
-        _custom_params = st.session_state.get('custom_params')
-        _using_custom  = st.session_state.get('custom_model') is not None
-
         # ══════════════════════════════════════════════════════
         # ── CUSTOM PARAMETERS PANEL (collapsible) ────────────
         # ══════════════════════════════════════════════════════
@@ -990,19 +1103,37 @@ else:
                                 if checked:
                                     selected_features.append(col)
 
+                            # Random Forest stays the default; boosting is an opt-in preview
+                            model_kind = st.radio(
+                                "Model", ["🌲 Random Forest", "⚡ Fast preview (gradient boosting)"],
+                                horizontal=True, key="cp_model_kind",
+                                help="Random Forest is the standard model and trains in the background. "
+                                     "Fast preview fits a different model (HistGradientBoosting on an 80/20 "
+                                     "train/validation split) in well under a second, so its predictions "
+                                     "differ from the Random Forest's"
+                            )
+                            fast_fit = model_kind.startswith("⚡")
+
                             if selected_features:
-                                # ── Silently retrain whenever feature set changes ──
-                                cache_key = tuple(sorted(selected_features))
+                                # ── Retrain whenever the feature set changes ──
+                                # Models are shared across sessions by (upload, dataset, features, params)
+                                # (utils/model_cache.py), so a combination trained before returns at once
+                                rf_params = {'n_estimators': 100, 'max_depth': 8, 'random_state': 42}
+                                data_hash = f"{hashlib.sha1(uploaded_csv.getvalue()).hexdigest()}:{dataset_version()}"
+                                cache_key = model_cache.model_key(
+                                    data_hash, selected_features,
+                                    {'model': 'hgb', **HGB_PARAMS} if fast_fit else {'model': 'rf', **rf_params}
+                                )
                                 prev_key  = st.session_state.get('_feat_cache_key')
+                                job       = st.session_state.get('_train_job')
 
-                                if cache_key != prev_key:
-                                    from sklearn.ensemble import RandomForestRegressor
-                                    Xc = merged[selected_features].fillna(merged[selected_features].median())
-                                    yc = merged['Exam_Score']
-                                    cm = RandomForestRegressor(
-                                        n_estimators=100, max_depth=8, random_state=42, n_jobs=-1
-                                    )
-                                    cm.fit(Xc, yc)
+                                if cache_key == prev_key:
+                                    if job is not None:   # toggled back to the active set
+                                        cancel_training()
+                                        model_changed = True
+                                elif job is None or job.key != cache_key:
+                                    cancel_training()     # superseded mid-fit
+                                    model_changed = True
 
                                     label_map = {
                                         'Attendance':        'Attendance %',
@@ -1017,12 +1148,25 @@ else:
                                         'features':  selected_features,
                                         'labels':    [label_map.get(f, f.replace('_', ' ').title()) for f in selected_features],
                                         'merged_df': merged,
+                                        'version':   f"custom-{cache_key}",
                                     }
-                                    st.session_state['custom_model']    = cm
-                                    st.session_state['custom_params']   = cp_info
-                                    st.session_state['custom_df']       = merged
-                                    st.session_state['_feat_cache_key'] = cache_key
-                                    st.session_state['prediction_result'] = None  # reset stale result
+                                    cached_model = model_cache.get(cache_key)
+                                    if cached_model is not None:
+                                        activate_custom(cached_model, cache_key, cp_info)
+                                    elif fast_fit:
+                                        # Every numeric column is binned once per upload (utils/binned.py)
+                                        binned = get_binned(data_hash, lambda: BinnedData(merged, all_numeric))
+                                        with perf.span('custom:fit'):
+                                            cm = binned.fit_subset(selected_features)
+                                        model_cache.put(cache_key, cm)
+                                        activate_custom(cm, cache_key, cp_info)
+                                    else:
+                                        Xc = merged[selected_features].fillna(merged[selected_features].median())
+                                        yc = merged['Exam_Score']
+                                        # utils/jobs.py — the estimator keeps the previous model until this finishes
+                                        st.session_state['_train_job'] = TrainJob(
+                                            cache_key, Xc, yc, meta=cp_info, n_jobs=-1, **rf_params
+                                        )
 
                                 # Show active feature list
                                 st.markdown(f"""
@@ -1033,6 +1177,12 @@ else:
                                     {", ".join(selected_features)}
                                 </div>
                                 """, unsafe_allow_html=True)
+                                val_scores = getattr(st.session_state.get('custom_model'), 'scores', None)
+                                if val_scores and st.session_state.get('_feat_cache_key') == cache_key:
+                                    st.caption(f"Fast preview (gradient boosting, not the Random Forest) — "
+                                               f"validation ({val_scores['n_val']:,} held-out students): "
+                                               f"R² {val_scores['r2']:.3f} · MAE {val_scores['mae']:.2f} marks · "
+                                               f"trained in {val_scores['seconds'] * 1e3:.0f} ms")
                             else:
                                 st.warning("Select at least one feature.")
 
@@ -1063,18 +1213,30 @@ else:
                 </div>
                 """, unsafe_allow_html=True)
                 if st.button("🔄 Reset to Default Model", key="cp_reset"):
+                    cancel_training()
                     for k in ('custom_model', 'custom_params', 'custom_df', '_feat_cache_key'):
                         st.session_state[k] = None
                     st.session_state['prediction_result'] = None
                     st.rerun()
 
+        # Only this fragment reran — refresh the page so the estimator and the
+        # training poller pick up the new model / job
+        if model_changed:
+            st.rerun(scope="app")
+
+    @st.fragment
+    @perf.fragment('estimator')
+    def estimator_panel():
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # ── ESTIMATOR PANEL ──────────────────────────────────
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # Re-read after possible retraining above
-        _active_model  = st.session_state.get('custom_model') or model
+        _active_model  = st.session_state.get('custom_model') or fast_model
         _custom_params = st.session_state.get('custom_params')
         _using_custom  = st.session_state.get('custom_model') is not None
+        # Memoized per (model version, input row) across sessions (utils/predict_cache.py)
+        _predictor = CachedModel(_active_model,
+                                 _custom_params['version'] if _using_custom else fast_version)
 
         st.markdown("<br>", unsafe_allow_html=True)
         col_in, col_out = st.columns([1, 1.3], gap="large")
@@ -1103,6 +1265,9 @@ else:
 
             st.markdown("<br>", unsafe_allow_html=True)
             run = st.button("🔍 Predict Grade", use_container_width=True)
+            if not _using_custom and grid_model is not None and not grid_model.exact:
+                st.caption(f"≈ Approximate: interpolated from a step-{grid_model.step} lookup grid "
+                           f"(max error {grid_model.max_error:.2f} marks)")
             st.markdown("</div>", unsafe_allow_html=True)
 
         with col_out:
@@ -1117,8 +1282,13 @@ else:
                     prev = custom_vals[2] if len(custom_vals) > 2 else 0
                     tut  = custom_vals[3] if len(custom_vals) > 3 else 0
                 else:
-                    input_data = np.array([[att, hrs, prev, tut]])
-                prediction = _active_model.predict(input_data)[0]
+                    # Same feature order / fills as training (utils/preprocess.py)
+                    input_data = preprocessor.vector({
+                        'Attendance': att, 'Hours_Studied': hrs,
+                        'Previous_Scores': prev, 'Tutoring_Sessions': tut,
+                    }) if preprocessor is not None else np.array([[att, hrs, prev, tut]])
+                with perf.span('estimator:predict'):
+                    prediction = _predictor.predict(input_data)[0]
                 st.session_state['prediction_result'] = {
                     'prediction':  prediction,
                     'att':         att,
@@ -1261,19 +1431,19 @@ Excellent indicators across attendance, study hours, and predicted grade (**{pre
                     # Reconstruct base input from stored result
                     _base_vals  = st.session_state['prediction_result'].get('custom_vals',
                                   [res['att'], res['hrs'], res['prev'], res['tut']])[:len(_feats_wif)]
-                    scenarios = {"Current": _active_model.predict([_base_vals])[0]}
-                    for fi, lbl in enumerate(_labels_wif):
-                        boosted = list(_base_vals)
-                        f_max   = int(_merged_wif[_feats_wif[fi]].max()) if _feats_wif[fi] in _merged_wif.columns else 100
-                        boosted[fi] = min(boosted[fi] + 10, f_max)
-                        scenarios[f"+10 {lbl[:14]}"] = _active_model.predict([boosted])[0]
+                    _f_max = [int(_merged_wif[f].max()) if f in _merged_wif.columns else 100 for f in _feats_wif]
+                    _changes = [(f"+10 {lbl[:14]}", {fi: min(_base_vals[fi] + 10, _f_max[fi])})
+                                for fi, lbl in enumerate(_labels_wif)]
                 else:
-                    scenarios = {
-                        "Current":          _active_model.predict([[att_r,              hrs_r,              res['prev'], tut_r]])[0],
-                        "+10% Attendance":  _active_model.predict([[min(att_r+10, 100), hrs_r,              res['prev'], tut_r]])[0],
-                        "+5 Study Hours":   _active_model.predict([[att_r,              min(hrs_r+5, 50),   res['prev'], tut_r]])[0],
-                        "+1 Tutoring":      _active_model.predict([[att_r,              hrs_r,              res['prev'], min(tut_r+1, 10)]])[0],
-                    }
+                    _base_vals = [att_r, hrs_r, res['prev'], tut_r]
+                    _changes = [
+                        ("+10% Attendance", {0: min(att_r + 10, 100)}),
+                        ("+5 Study Hours",  {1: min(hrs_r + 5, 50)}),
+                        ("+1 Tutoring",     {3: min(tut_r + 1, 10)}),
+                    ]
+                # Every scenario scored in one batched predict call (utils/scenarios.py)
+                with perf.span('estimator:what_if'):
+                    scenarios = what_if(_predictor.predict, _base_vals, _changes)
                 fig7, ax7 = plt.subplots(figsize=(6, 2.5), facecolor='#1a1e2b')
                 ax7.set_facecolor('#1a1e2b')
                 s_labels = list(scenarios.keys())
@@ -1288,29 +1458,53 @@ Excellent indicators across attendance, study hours, and predicted grade (**{pre
                 ax7.grid(axis='x', alpha=0.07, color='white')
                 plt.tight_layout(); st.pyplot(fig7); plt.close()
 
+                # Sensitivity sweep over the first two features — the full grid is one batch.
+                # Only computed when asked for, and the image is cached per (model, base row).
+                if len(_base_vals) >= 2 and st.toggle("🗺️ Response Surface — explore two inputs at once",
+                                                      key="show_surface"):
+                    if _using_custom and _custom_params:
+                        _sx_lbl, _sy_lbl = _labels_wif[0], _labels_wif[1]
+                        _sx = np.linspace(_merged_wif[_feats_wif[0]].min(), _f_max[0], 60)
+                        _sy = np.linspace(_merged_wif[_feats_wif[1]].min(), _f_max[1], 60)
+                    else:
+                        _sx_lbl, _sy_lbl = "Attendance %", "Hours Studied / Week"
+                        _sx, _sy = np.arange(0, 101), np.arange(0, 51)
+
+                    def draw_surface():
+                        # Raw model, not _predictor: thousands of one-off rows would flush the prediction cache
+                        with perf.span('estimator:sweep'):
+                            surface = sweep(_active_model.predict, _base_vals, 0, _sx, 1, _sy)
+                        return charts.response_surface(_sx, _sy, surface, _base_vals, _sx_lbl, _sy_lbl)
+
+                    _version = _custom_params['version'] if _using_custom else fast_version
+                    _png = cached_png(('surface', _version, tuple(float(v) for v in _base_vals)), draw_surface)
+                    st.image(_png, use_container_width=True)
+
+    # Each section is a fragment: its widgets rerun only that section, not the whole page
+    with tab2:
+        if st.session_state['_train_error']:
+            st.error(f"❌ Training failed: {st.session_state['_train_error']}")
+            st.session_state['_train_error'] = None
+        custom_panel()
+        # Polls a background fit twice a second and swaps the new model in when done.
+        # Starting a job reruns the whole app, so the poller appears exactly while one exists.
+        if st.session_state['_train_job'] is not None:
+            training_status()
+        estimator_panel()
+
 
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # TAB 3 — DATA EXPLORER
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    with tab3:
+    @st.fragment
+    @perf.fragment('explorer_overview')
+    def explorer_overview():
         st.markdown("<br>", unsafe_allow_html=True)
         e1, e2 = st.columns([1, 1], gap="large")
 
         with e1:
             st.markdown("<div class='section-header'>Feature Correlation Heatmap</div>", unsafe_allow_html=True)
-            num_cols = ['Attendance', 'Hours_Studied', 'Previous_Scores',
-                        'Tutoring_Sessions', 'Sleep_Hours', 'Exam_Score']
-            corr_matrix = df_raw[[c for c in num_cols if c in df_raw.columns]].corr()
-
-            fig8, ax8 = plt.subplots(figsize=(6, 5), facecolor='#1a1e2b')
-            ax8.set_facecolor('#1a1e2b')
-            sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm',
-                        ax=ax8, linewidths=0.5, linecolor='#13161e',
-                        annot_kws={'size': 9, 'color': 'white'},
-                        cbar_kws={'shrink': 0.8})
-            ax8.tick_params(colors='#e2e8f0', labelsize=9)
-            ax8.set_title('Numeric Feature Correlations', color='#e2e8f0', pad=12)
-            plt.tight_layout(); st.pyplot(fig8); plt.close()
+            show_chart('heatmap', charts.heatmap)
 
         with e2:
             st.markdown("<div class='section-header'>Top & Bottom Performers</div>", unsafe_allow_html=True)
@@ -1333,21 +1527,62 @@ Excellent indicators across attendance, study hours, and predicted grade (**{pre
                 use_container_width=True, height=min(top_n * 38 + 38, 280)
             )
 
+    @st.fragment
+    @perf.fragment('explorer_table')
+    def explorer_table():
         st.markdown("<div class='section-header' style='margin-top:20px;'>Full Dataset Preview</div>", unsafe_allow_html=True)
-        ds1, ds2 = st.columns([1, 1], gap="medium")
+        scores = store.get_scores()
+        ds1, ds2, ds3, ds4 = st.columns([1, 1, 0.7, 0.7], gap="medium")
         with ds1:
             search_att = st.slider("Filter by minimum attendance", 0, 100, 0)
         with ds2:
             name_search_explorer = st.text_input("Search by name", placeholder="e.g. Deepak",
                                                   help="Partial name match, case-insensitive")
-        filtered_df = df_raw[df_raw['Attendance'] >= search_att].copy()
+        with ds3:
+            explorer_risk = st.selectbox("Predicted risk", ["All"] + RISK_TIERS, key="explorer_risk")
+        with ds4:
+            explorer_sort = st.selectbox("Sort by", ["Row order", "Predicted Score ↑", "Predicted Score ↓"],
+                                         key="explorer_sort")
+        explorer_ids = store.get_attendance_index().select(att_min=search_att, order=None)
+        if explorer_risk != "All":
+            explorer_ids = explorer_ids[scores['Risk_Tier'].cat.codes.to_numpy()[explorer_ids] == RISK_TIERS.index(explorer_risk)]
+        if explorer_sort != "Row order":
+            order = np.argsort(scores['Predicted_Score'].to_numpy()[explorer_ids], kind='stable')
+            explorer_ids = explorer_ids[order] if explorer_sort.endswith("↑") else explorer_ids[order[::-1]]
+        match_label = "matching"
         if name_search_explorer.strip():
-            if 'Name' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Name'].str.contains(name_search_explorer.strip(), case=False, na=False)]
+            if 'Name' in df_raw.columns:
+                name_index = store.get_name_index()
+                matches = name_index.search(name_search_explorer)
+                if len(matches) == 0:
+                    close = name_index.fuzzy(name_search_explorer)
+                    if close:
+                        # Same notice as the portal: approximate hits are never shown as matches
+                        suggestions = ", ".join(f"**{n}** ({s:.0%})" for n, s, _ in close)
+                        st.info(f"No exact match for **\"{name_search_explorer.strip()}\"** — "
+                                f"showing closest names: {suggestions}")
+                        matches = np.concatenate([rows for _, _, rows in close])
+                        match_label = "close to"
+                explorer_ids = explorer_ids[np.isin(explorer_ids, matches)]
             else:
                 st.warning("Name column not found in dataset.")
         # Show Name as first column if it exists
-        explorer_cols = (['Name'] if 'Name' in filtered_df.columns else []) +                         [c for c in filtered_df.columns if c != 'Name']
-        st.info(f"Showing {len(filtered_df):,} students with attendance ≥ {search_att}%"
-                + (f"  |  matching \"{name_search_explorer.strip()}\"" if name_search_explorer.strip() else ""))
-        st.dataframe(filtered_df[explorer_cols].head(200), use_container_width=True, height=350)
\ No newline at end of file
+        explorer_cols = (['Name'] if 'Name' in df_raw.columns else []) + \
+                        [c for c in df_raw.columns if c != 'Name']
+        st.info(f"Showing {len(explorer_ids):,} students with attendance ≥ {search_att}%"
+                + (f"  |  {match_label} \"{name_search_explorer.strip()}\"" if name_search_explorer.strip() else ""))
+        page, page_size = page_controls(len(explorer_ids), key="explorer")
+        page_ids = page_slice(explorer_ids, page, page_size)
+        page_df  = take(df_raw, page_ids, explorer_cols)
+        page_df['Predicted_Score'] = scores['Predicted_Score'].to_numpy()[page_ids].round(1)
+        page_df['Predicted_Risk']  = scores['Risk_Tier'].to_numpy()[page_ids]
+        page_df.index = page_ids
+        st.dataframe(page_df, use_container_width=True, height=350)
+
+    with tab3:
+        explorer_overview()
+        explorer_table()
+
+
+# ─── Performance (admin) ─────────────────────────────────────────────────────────
+finish_run()
@@ -0,0 +1,223 @@
+"""Headless benchmarks for the app's hot paths at several dataset sizes.
+
+    python benchmarks/bench.py                        # the real 6,607 rows and 50,000 synthetic
+    python benchmarks/bench.py --sizes 6607,1000000 --only load,filter
+    python benchmarks/bench.py --save-baseline        # store this run as the baseline
+
+Each case reports p50 / p95 latency over repeated runs, plus the peak Python
+heap (tracemalloc) from one extra traced run, so tracing does not skew the
+timings. Results are written to benchmarks/results/. Any case whose p50 is
+more than --tolerance slower than benchmarks/baseline.json is flagged, and
+the exit status is then 1.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from utils import charts
+from utils.attendance_index import AttendanceIndex
+from utils.dataset import CACHE_DIR, CSV_PATH, compact_dtypes, ensure_cache, file_hash, load_dataset
+from utils.figcache import render_png
+from utils.flat_forest import FlatForest
+from utils.grid_model import GridModel
+from utils.name_index import NameIndex
+from utils.paging import page_slice, take
+from utils.predict_cache import cached_predict
+from utils.preprocess import CATEGORICAL_FILLS, FEATURES, fit_preprocessor, preprocess_data
+from utils.scenarios import sweep, what_if
+from utils.scoring import score_frame
+from utils.selection import build_model
+from utils.summary import compute_summary
+from utils.synth import CohortModel, write_cohort
+from model.train_model import DEFAULT_FAMILY, DEFAULT_PARAMS, SPLIT, fit_run
+from utils.runs import run_key
+
+RESULTS_DIR   = 'benchmarks/results'
+BASELINE_PATH = 'benchmarks/baseline.json'
+DEFAULT_SIZES = [6607, 50_000]
+REPEATS       = 20     # timed runs per case (expensive cases use fewer)
+TOLERANCE     = 0.25   # p50 more than 25% above the baseline is a regression
+MODEL_PATH    = 'model/model.pkl'
+
+
+def measure(fn, repeats=REPEATS, warmup=1):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'p50_ms':  float(np.percentile(times, 50) * 1e3),
+        'p95_ms':  float(np.percentile(times, 95) * 1e3),
+        'peak_mb': peak / 1e6,
+        'repeats': repeats,
+    }
+
+
+def make_cohort(n, out_dir):
+    """The real CSV at its own size, otherwise a synthetic cohort of `n` students."""
+    path = os.path.join(out_dir, f"bench_{n}.csv")
+    if n == len(pd.read_csv(CSV_PATH, usecols=['Exam_Score'])):
+        shutil.copyfile(CSV_PATH, path)
+        return path
+    return write_cohort(CohortModel.from_csv(), n, path)
+
+
+def train_run(csv_path, out_dir):
+    """model/train_model.train() without publishing: CSV read + hash, run key,
+    preprocessor fit, model fit + evaluation, artifact dump and flat-forest
+    compile, into `out_dir` so the published model is never touched."""
+    df = pd.read_csv(csv_path)
+    run_key(file_hash(csv_path), {'features': FEATURES, 'fills': CATEGORICAL_FILLS},
+            DEFAULT_FAMILY, DEFAULT_PARAMS, SPLIT)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return fit_run(df, fit_preprocessor(df), DEFAULT_FAMILY, DEFAULT_PARAMS, out_dir)
+
+
+def cases(csv_path, model):
+    """`{name: (fn, repeats)}` for one dataset; model cases only when a model is trained."""
+    ensure_cache(csv_path)
+    df = load_dataset(csv_path=csv_path)
+    summary = compute_summary(df)
+    att_index = AttendanceIndex(df[['Attendance', 'Exam_Score', 'Gender']])
+    names = NameIndex(df['Name'])
+    view_cols = ['Name', 'Gender', 'Attendance', 'Exam_Score']
+
+    def filter_page():
+        ids = att_index.select(60, 100, gender='Male', order='Exam_Score', ascending=False)
+        return take(df, page_slice(ids, 1, 50), view_cols)
+
+    found = {
+        'load.csv_parse':    (lambda: compact_dtypes(pd.read_csv(csv_path)), 5),
+        'load.dataset':      (lambda: load_dataset(csv_path=csv_path), 10),
+        'filter.index':      (lambda: AttendanceIndex(df[['Attendance', 'Exam_Score', 'Gender']]), 10),
+        'filter.page':       (filter_page, REPEATS),
+        'filter.pandas':     (lambda: df[(df['Attendance'] >= 60) & (df['Gender'] == 'Male')]
+                                      .sort_values('Exam_Score', ascending=False).head(50), REPEATS),
+        'search.index':      (lambda: NameIndex(df['Name']), 3),
+        'search.substring':  (lambda: names.search('sha'), REPEATS),
+        'search.fuzzy':      (lambda: names.fuzzy('priya shrma'), REPEATS),
+        'summary.compute':   (lambda: compute_summary(df), 10),
+        'render.trend':      (lambda: render_png(charts.trend(summary)), 5),
+        'render.heatmap':    (lambda: render_png(charts.heatmap(summary)), 5),
+    }
+    if model is None:
+        return found
+
+    flat = FlatForest(model) if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_') else None
+    fast = flat or model
+    row = np.array([[85, 20, 70, 2]], dtype=np.float64)
+    changes = [("+10% Attendance", {0: 95}), ("+5 Study Hours", {1: 25}), ("+1 Tutoring", {3: 3})]
+    X, y = preprocess_data(df, fit_preprocessor(df))
+
+    found.update({
+        'predict.sklearn_row': (lambda: model.predict(row), REPEATS),
+        'predict.fast_row':    (lambda: fast.predict(row), REPEATS),
+        'predict.cached_row':  (lambda: cached_predict(fast.predict, 'bench', row), REPEATS),
+        'whatif.scenarios':    (lambda: what_if(fast.predict, row[0], changes), REPEATS),
+        'whatif.sweep':        (lambda: sweep(fast.predict, row[0], 0, np.arange(0, 101), 1, np.arange(0, 51)), 5),
+        'grid.build_step5':    (lambda: GridModel(fast.predict, step=5), 1),
+        'score.cohort':        (lambda: score_frame(fast, df), 3),
+        'rf.fit':              (lambda: build_model(DEFAULT_FAMILY, DEFAULT_PARAMS, n_jobs=-1).fit(X, y), 1),
+        'train.run':           (lambda: train_run(csv_path, os.path.join(os.path.dirname(csv_path), 'run')), 1),
+    })
+    return found
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Cases whose p50 is more than `tolerance` above the baseline's."""
+    regressions = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if base and res['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append((key, base['p50_ms'], res['p50_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated cohort sizes")
+    parser.add_argument('--only', default='', help="comma-separated case prefixes, e.g. load,predict")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    prefixes = tuple(p for p in args.only.split(',') if p)
+    model = joblib.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+    if model is None:
+        print(f"⚠️  {MODEL_PATH} not found — skipping predict / what-if / score / train cases")
+
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        for n in sizes:
+            csv_path = make_cohort(n, tmp_dir)
+            print(f"\n── {n:,} students ──")
+            print(f"{'case':<22} {'p50 ms':>10} {'p95 ms':>10} {'peak MB':>9}")
+            for name, (fn, repeats) in cases(csv_path, model).items():
+                if prefixes and not name.startswith(prefixes):
+                    continue
+                res = measure(fn, repeats)
+                results[f"{name}@{n}"] = res
+                print(f"{name:<22} {res['p50_ms']:>10.2f} {res['p95_ms']:>10.2f} {res['peak_mb']:>9.1f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for path in glob.glob(os.path.join(CACHE_DIR, 'bench_*')):
+            os.remove(path)
+
+    run = {
+        'created':  time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python':   platform.python_version(),
+        'platform': platform.platform(),
+        'cpus':     os.cpu_count(),
+        'results':  results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults: {out}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet — run with --save-baseline to create one.")
+        return 0
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"✅ No regressions against {BASELINE_PATH} (tolerance {args.tolerance:.0%})")
+        return 0
+    print(f"❌ {len(regressions)} regression(s) against {BASELINE_PATH}:")
+    for key, base, now in regressions:
+        print(f"   {key:<30} {base:>9.2f} ms → {now:>9.2f} ms ({now / base - 1:+.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
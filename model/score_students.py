@@ -0,0 +1,110 @@
+import pandas as pd
+import argparse
+import joblib
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.getcwd())
+from utils.dataset import file_hash
+from utils.export import iter_csv, iter_gzip, write_parquet
+from utils.flat_forest import FLAT_PATH
+from utils.preprocess import PREPROCESSOR_PATH, load_preprocessor
+from utils.scoring import RISK_TIERS, score_frame
+
+MODEL_PATH  = 'model/model.pkl'
+CHUNK_ROWS  = 100_000   # rows read, scored and written at a time
+ID_COLUMNS  = ['Student_ID', 'Name', 'Attendance']   # carried into the output when present
+
+# Loaded once per worker process (see _init_worker)
+_model = _preprocessor = None
+
+def _init_worker(model_path, preprocessor_path):
+    global _model, _preprocessor
+    model = None
+    # Same predictions from the flat-array copy when it matches this model, only faster;
+    # its arrays are memory-mapped, so the pickled forest is only loaded as the fallback
+    if model_path == MODEL_PATH and os.path.exists(FLAT_PATH):
+        flat = joblib.load(FLAT_PATH, mmap_mode='r')
+        if flat.source == file_hash(model_path):
+            model = flat
+    if model is None:
+        model = joblib.load(model_path)
+        # The pool already uses every core: one thread per worker, not cpu_count each
+        if 'n_jobs' in getattr(model, 'get_params', dict)():
+            model.set_params(n_jobs=1)
+    _model = model
+    _preprocessor = load_preprocessor(preprocessor_path)
+
+def score_chunk(chunk, all_columns=False):
+    """Predicted score + risk tier for one chunk, using the training-time preprocessing."""
+    scores = score_frame(_model, chunk, preprocessor=_preprocessor)
+    keep = list(chunk.columns) if all_columns else [c for c in ID_COLUMNS if c in chunk.columns]
+    out = chunk[keep].reset_index(drop=True)
+    out['Predicted_Score'] = scores['Predicted_Score'].round(2)
+    out['Risk_Tier'] = pd.Categorical.from_codes(scores['Risk_Code'], RISK_TIERS)
+    return out
+
+def scored_chunks(pool, chunks, all_columns, in_flight):
+    """Score chunks in the pool in input order, with at most `in_flight` chunks pending."""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(score_chunk, chunk, all_columns))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def score(csv_path, out_path, model_path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH,
+          chunk_rows=CHUNK_ROWS, workers=None, all_columns=False):
+    for path in (csv_path, model_path, preprocessor_path):
+        if not os.path.exists(path):
+            print(f"Error: {path} not found! Train the model first with model/train_model.py")
+            return None
+
+    workers = workers or os.cpu_count()
+    rows, t0 = 0, time.perf_counter()
+
+    def counted(frames):
+        nonlocal rows
+        for frame in frames:
+            rows += len(frame)
+            elapsed = time.perf_counter() - t0
+            print(f"\r   {rows:,} rows scored ({rows / elapsed:,.0f} rows/s)", end='', flush=True)
+            yield frame
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, preprocessor_path)) as pool:
+        chunks = pd.read_csv(csv_path, chunksize=chunk_rows)
+        frames = counted(scored_chunks(pool, chunks, all_columns, in_flight=workers * 2))
+        if out_path.endswith('.parquet'):
+            write_parquet(frames, out_path)
+        else:
+            pieces = iter_csv(frames)
+            if out_path.endswith('.gz'):
+                pieces = iter_gzip(pieces)
+            with open(out_path, 'wb') as f:
+                for piece in pieces:
+                    f.write(piece)
+
+    elapsed = time.perf_counter() - t0
+    print(f"\n✅ {rows:,} students scored in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s, {workers} workers) → {out_path}")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a student CSV with the trained model.")
+    parser.add_argument('csv', help="input student CSV (same columns as the training data)")
+    parser.add_argument('out', help="output file: .csv, .csv.gz or .parquet")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument('--all-columns', action='store_true',
+                        help="copy every input column to the output, not just the ID columns")
+    args = parser.parse_args()
+    done = score(args.csv, args.out, args.model, args.preprocessor, args.chunk_rows,
+                 args.workers, args.all_columns)
+    sys.exit(0 if done is not None else 1)
@@ -2,38 +2,151 @@ import pandas as pd
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
+import argparse
 import joblib
 import os
 import sys
+import time
 
 sys.path.append(os.getcwd())
-from utils.preprocess import preprocess_data
+from utils import grid_model, runs, selection
+from utils.dataset import file_hash
+from utils.flat_forest import FLAT_PATH, compile_and_save
+from utils.preprocess import (CATEGORICAL_FILLS, FEATURES, PREPROCESSOR_PATH, fit_preprocessor,
+                              preprocess_data, save_preprocessor)
 
-def train():
+MODEL_PATH = 'model/model.pkl'
+
+# Used unless --select picks something else
+DEFAULT_FAMILY = 'sklearn.ensemble.RandomForestRegressor'
+DEFAULT_PARAMS = {'n_estimators': 200, 'max_depth': 10, 'random_state': 42}
+SPLIT          = {'test_size': 0.2, 'random_state': 42}
+
+# Run artifact -> where the app loads it from
+PUBLISHED = {
+    'model.pkl':           MODEL_PATH,
+    'preprocessor.joblib': PREPROCESSOR_PATH,
+    'model_flat.joblib':   FLAT_PATH,
+}
+
+def fit_run(df, preprocessor, family, params, out_dir):
+    """Train one model and write its artifacts + metrics into `out_dir`."""
+    X, y = preprocess_data(df, preprocessor)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, **SPLIT)
+
+    t0 = time.perf_counter()
+    model = selection.build_model(family, params, n_jobs=-1)
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+
+    y_pred = model.predict(X_test)
+    os.makedirs(out_dir, exist_ok=True)
+    model_path = os.path.join(out_dir, 'model.pkl')
+    joblib.dump(model, model_path)
+    save_preprocessor(preprocessor, os.path.join(out_dir, 'preprocessor.joblib'))
+    source = file_hash(model_path)
+    # Flat-array copy of the forest for fast single-row prediction in the app
+    # (other model families are served as-is; the app ignores a stale flat copy)
+    if isinstance(model, RandomForestRegressor):
+        compile_and_save(model, source=source, path=os.path.join(out_dir, 'model_flat.joblib'))
+    return {
+        'family':     family,
+        'params':     params,
+        'rows':       len(df),
+        'r2':         float(r2_score(y_test, y_pred)),
+        'mae':        float(mean_absolute_error(y_test, y_pred)),
+        'fit_s':      fit_s,
+        'model_sha1': source,
+    }
+
+def train(grid_step=None, select=False, folds=selection.CV_FOLDS, workers=None,
+          metric='r2', latency_weight=selection.LATENCY_WEIGHT, force=False):
     csv_path = 'data/StudentPerformanceFactors.csv'
     if not os.path.exists(csv_path):
         print("Error: StudentPerformanceFactors.csv not found in data/ folder!")
         return
 
-    df = pd.read_csv(csv_path)
-    print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+    data_hash = file_hash(csv_path)
+    preprocess_config = {'features': FEATURES, 'fills': CATEGORICAL_FILLS}
+    df = preprocessor = None
 
-    X, y = preprocess_data(df)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    def load():
+        nonlocal df, preprocessor
+        if df is None:
+            df = pd.read_csv(csv_path)
+            print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+            # Fitted once here and saved with the model, so scoring and the app reuse this exact transform
+            preprocessor = fit_preprocessor(df)
 
-    model = RandomForestRegressor(n_estimators=200, max_depth=10, random_state=42, n_jobs=-1)
-    model.fit(X_train, y_train)
+    family, params = DEFAULT_FAMILY, DEFAULT_PARAMS
+    if select:
+        # k-fold CV over every candidate in a process pool; results cached per data + config
+        load()
+        X, y = preprocess_data(df, preprocessor)
+        results = selection.select(X, y, f"{data_hash}:{','.join(FEATURES)}", folds=folds,
+                                   workers=workers, metric=metric, latency_weight=latency_weight)
+        selection.report(results)
+        family, params = results[0]['family'], results[0]['params']
+        print(f"Selected {family.rsplit('.', 1)[1]} {params}\n")
 
-    y_pred = model.predict(X_test)
-    r2  = r2_score(y_test, y_pred)
-    mae = mean_absolute_error(y_test, y_pred)
+    # Content-addressed run: identical data + preprocessing + model config reuse the stored artifacts
+    key = runs.run_key(data_hash, preprocess_config, family, params, SPLIT)
+    out_dir = runs.run_dir(key)
+    meta = None if force else runs.load_meta(key)
+    if meta is None:
+        load()
+        meta = fit_run(df, preprocessor, family, params, out_dir)
+        runs.save_meta(key, dict(meta, data_sha1=data_hash, preprocess=preprocess_config, split=SPLIT))
+        status = "✅ Model trained"
+    else:
+        status = "✅ Unchanged — reusing"
 
     os.makedirs('model', exist_ok=True)
-    joblib.dump(model, 'model/model.pkl')
+    if not os.path.exists(MODEL_PATH) or file_hash(MODEL_PATH) != meta['model_sha1']:
+        for name, dst in PUBLISHED.items():
+            src = os.path.join(out_dir, name)
+            if os.path.exists(src):
+                runs.publish(src, dst)
+
+    grid = None
+    if grid_step:
+        # Optional lookup table over the whole input lattice (exact at step 1, interpolated above)
+        grid_path = os.path.join(out_dir, f"model_grid_s{grid_step}.joblib")
+        if not os.path.exists(grid_path) or force:
+            model = joblib.load(MODEL_PATH)
+            flat = joblib.load(FLAT_PATH) if isinstance(model, RandomForestRegressor) else None
+            grid_model.compile_and_save((flat or model).predict, grid_step, meta['model_sha1'], grid_path)
+        runs.publish(grid_path, grid_model.GRID_PATH)
+        grid = joblib.load(grid_path, mmap_mode='r')
 
-    print(f"✅ Model saved to model/model.pkl")
-    print(f"   R² Score : {r2:.4f}")
-    print(f"   MAE      : {mae:.2f} marks")
+    print(f"{status} run {key[:16]} → {MODEL_PATH}")
+    print(f"   Run dir   : {out_dir}")
+    print(f"   Preprocess: {PREPROCESSOR_PATH}")
+    if os.path.exists(os.path.join(out_dir, 'model_flat.joblib')):
+        print(f"   Flat copy : {FLAT_PATH}")
+    if grid is not None:
+        print(f"   Grid      : {grid_model.GRID_PATH} (step {grid.step}, {grid.nbytes / 1e6:.1f} MB, "
+              f"max error {grid.max_error:.4f})")
+    print(f"   R² Score : {meta['r2']:.4f}")
+    print(f"   MAE      : {meta['mae']:.2f} marks")
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the exam score model.")
+    parser.add_argument('--grid', action='store_true',
+                        help="also precompute predictions over the input lattice")
+    parser.add_argument('--grid-step', type=int, default=1,
+                        help="lattice spacing for --grid (1 = every integer input, exact)")
+    parser.add_argument('--select', action='store_true',
+                        help="pick the model family / hyperparameters by k-fold CV first")
+    parser.add_argument('--folds', type=int, default=selection.CV_FOLDS)
+    parser.add_argument('--workers', type=int, default=None, help="CV processes (default: all cores)")
+    parser.add_argument('--metric', choices=['r2', 'mae'], default='r2',
+                        help="accuracy term of the selection objective")
+    parser.add_argument('--latency-weight', type=float, default=selection.LATENCY_WEIGHT,
+                        help="objective penalty per ms of single-row predict latency")
+    parser.add_argument('--force', action='store_true',
+                        help="retrain even if an identical run is already stored")
+    args = parser.parse_args()
+    train(grid_step=args.grid_step if args.grid else None, select=args.select, folds=args.folds,
+          workers=args.workers, metric=args.metric, latency_weight=args.latency_weight,
+          force=args.force)
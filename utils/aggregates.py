@@ -0,0 +1,411 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import CACHE_DIR, CSV_PATH, dataset_version, load_dataset
+
+# Numeric columns shown in the Data Explorer heatmap (Attendance/Exam_Score drive the KPIs)
+SUMMARY_COLS = ['Attendance', 'Hours_Studied', 'Previous_Scores',
+                'Tutoring_Sessions', 'Sleep_Hours', 'Exam_Score']
+
+AT_RISK_THRESHOLD = 75
+BAND_EDGES   = [0, 60, 75, 85, 100]          # right-closed, same as pd.cut
+BAND_LABELS  = ['<60%', '60–75%', '75–85%', '85–100%']
+HIST_BINS    = 30
+TREND_SAMPLE = 800
+STATE_FORMAT = 2     # bump when RunningAggregates.to_state changes shape
+
+
+def _band_index(att):
+    in_range = (att > BAND_EDGES[0]) & (att <= BAND_EDGES[-1])
+    band = np.searchsorted(BAND_EDGES, att[in_range], side='left') - 1
+    return band, in_range
+
+
+def _add_counts(counts, values, sign):
+    """Add `sign` × the value counts of non-negative integer `values` to `counts`."""
+    idx = np.rint(values).astype(np.int64)
+    delta = np.bincount(idx, minlength=len(counts))
+    if len(delta) > len(counts):
+        counts = np.concatenate([counts, np.zeros(len(delta) - len(counts), dtype=np.int64)])
+    counts[:len(delta)] += sign * delta
+    return counts
+
+
+def _value_hist(counts):
+    # Same bins/edges as np.histogram(raw_values, bins=HIST_BINS): the range is
+    # the observed min..max, and each distinct value is weighted by its count.
+    values = np.flatnonzero(counts)
+    if len(values) == 0:
+        return {'counts': [0] * HIST_BINS, 'edges': np.linspace(0, 1, HIST_BINS + 1).tolist()}
+    hist, edges = np.histogram(values, bins=HIST_BINS, range=(values[0], values[-1]),
+                               weights=counts[values])
+    return {'counts': hist.astype(np.int64).tolist(), 'edges': edges.tolist()}
+
+
+class RunningAggregates:
+    """Sufficient statistics behind the dashboard summary.
+
+    Missing values are handled the way pandas does: per-column means and
+    histograms count the values present in that column, and the correlation
+    matrix is pairwise-complete (every pair of columns uses the rows where
+    both are present, like `DataFrame.corr()`). For that it keeps, per pair
+    (i, j), the row count, the sum and sum of squares of column i and the
+    cross-product over those rows; the diagonals are the per-column totals.
+    It also keeps attendance-band counts/score sums, the value counts of
+    Attendance and Exam_Score, and a reservoir sample of (Attendance,
+    Exam_Score) points for the trend chart. Rows can be added, removed or
+    replaced in O(delta) and every KPI, the correlation matrix, band means
+    and both histograms are derived from these totals in O(1).
+    """
+
+    def __init__(self, columns=SUMMARY_COLS):
+        self.columns      = list(columns)
+        k                 = len(self.columns)
+        self.rows         = 0        # rows accounted for, including ones with missing values
+        self.pair_n       = np.zeros((k, k))   # [i, j]: rows where columns i and j are both present
+        self.pair_sums    = np.zeros((k, k))   # [i, j]: sum of column i over those rows
+        self.pair_sq      = np.zeros((k, k))   # [i, j]: sum of squares of column i over those rows
+        self.cross        = np.zeros((k, k))   # [i, j]: sum of x_i * x_j over those rows
+        self.band_counts  = np.zeros(len(BAND_LABELS), dtype=np.int64)
+        self.band_sums    = np.zeros(len(BAND_LABELS))
+        self.at_risk      = 0
+        self.att_counts   = np.zeros(0, dtype=np.int64)
+        self.score_counts = np.zeros(0, dtype=np.int64)
+        self.seen         = 0        # complete (Attendance, Exam_Score) rows ever added (drives the reservoir)
+        self.sample_x     = np.zeros(0)
+        self.sample_y     = np.zeros(0)
+        self.sample_ids   = np.zeros(0, dtype=np.int64)   # row position each sampled point came from
+
+    @classmethod
+    def from_frame(cls, df):
+        agg = cls([c for c in SUMMARY_COLS if c in df.columns])
+        att, score, pos = agg._apply(df, 1)
+        agg.seen = len(att)
+        pick = np.sort(np.random.default_rng(42).choice(len(att), min(TREND_SAMPLE, len(att)), replace=False))
+        agg.sample_x, agg.sample_y, agg.sample_ids = att[pick], score[pick], pos[pick]
+        return agg
+
+    def _matrix(self, df):
+        return df[self.columns].to_numpy(dtype=np.float64)
+
+    def _apply(self, df, sign):
+        """Add (`sign`=1) or retract (-1) rows; returns their complete (Attendance, Exam_Score) points."""
+        X = self._matrix(df)
+        present = ~np.isnan(X)
+        M  = present.astype(np.float64)
+        X0 = np.where(present, X, 0.0)
+
+        self.rows      += sign * len(X)
+        self.pair_n    += sign * (M.T @ M)
+        self.pair_sums += sign * (X0.T @ M)
+        self.pair_sq   += sign * ((X0 * X0).T @ M)
+        self.cross     += sign * (X0.T @ X0)
+
+        ia, ie = self.columns.index('Attendance'), self.columns.index('Exam_Score')
+        att, score = X[:, ia], X[:, ie]
+        att_ok, score_ok = present[:, ia], present[:, ie]
+        self.at_risk += sign * int((att[att_ok] < AT_RISK_THRESHOLD).sum())
+
+        # Band means average the scores present in each band (NaN attendance is in no band)
+        band, in_range = _band_index(np.where(score_ok, att, np.nan))
+        self.band_counts += sign * np.bincount(band, minlength=len(BAND_LABELS))
+        self.band_sums   += sign * np.bincount(band, weights=score[in_range], minlength=len(BAND_LABELS))
+
+        self.att_counts   = _add_counts(self.att_counts, att[att_ok], sign)
+        self.score_counts = _add_counts(self.score_counts, score[score_ok], sign)
+        pair = np.flatnonzero(att_ok & score_ok)
+        return att[pair], score[pair], pair
+
+    def _reservoir(self, att, score, ids):
+        # Algorithm R: row i of the stream replaces a random slot with prob k/(i+1)
+        fill = max(0, min(TREND_SAMPLE - len(self.sample_x), len(att)))
+        self.sample_x   = np.concatenate([self.sample_x, att[:fill]])
+        self.sample_y   = np.concatenate([self.sample_y, score[:fill]])
+        self.sample_ids = np.concatenate([self.sample_ids, ids[:fill]])
+        positions = np.arange(self.seen + fill, self.seen + len(att))
+        if len(positions):
+            rng  = np.random.default_rng(self.seen)
+            slot = rng.integers(0, positions + 1)
+            keep = slot < TREND_SAMPLE
+            self.sample_x[slot[keep]]   = att[fill:][keep]
+            self.sample_y[slot[keep]]   = score[fill:][keep]
+            self.sample_ids[slot[keep]] = ids[fill:][keep]
+        self.seen += len(att)
+
+    def _resample(self, ids, new_rows):
+        """Point sampled entries of the edited rows `ids` at their new values."""
+        ids = np.asarray(ids, dtype=np.int64)
+        hit = np.flatnonzero(np.isin(self.sample_ids, ids))
+        if len(hit) == 0:
+            return
+        order = np.argsort(ids, kind='stable')
+        j = order[np.searchsorted(ids[order], self.sample_ids[hit])]
+        att   = new_rows['Attendance'].to_numpy(dtype=np.float64)[j]
+        score = new_rows['Exam_Score'].to_numpy(dtype=np.float64)[j]
+        ok = ~(np.isnan(att) | np.isnan(score))
+        self.sample_x[hit[ok]] = att[ok]
+        self.sample_y[hit[ok]] = score[ok]
+        drop = hit[~ok]   # the edited row lost a value: it can no longer be plotted
+        if len(drop):
+            self.sample_x   = np.delete(self.sample_x, drop)
+            self.sample_y   = np.delete(self.sample_y, drop)
+            self.sample_ids = np.delete(self.sample_ids, drop)
+
+    def add(self, df):
+        """Account for newly appended rows (positions continue after the existing ones)."""
+        start = self.rows
+        att, score, pos = self._apply(df, 1)
+        self._reservoir(att, score, start + pos)
+
+    def remove(self, df):
+        """Retract rows that were previously added."""
+        self._apply(df, -1)
+
+    def update(self, old_rows, new_rows, ids=None):
+        """Replace `old_rows` by their edited versions (e.g. updated attendance).
+
+        `ids` are the rows' positions in the file; when given, any of them in
+        the trend-chart sample is redrawn at its new value.
+        """
+        self._apply(old_rows, -1)
+        self._apply(new_rows, 1)
+        if ids is not None:
+            self._resample(ids, new_rows)
+
+    def summary(self, version=None):
+        """Dashboard summary (see utils/summary.py) derived from the running totals."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.diag(self.pair_sums) / np.diag(self.pair_n)
+            # Pairwise-complete moments: [i, j] uses only rows where both i and j are present
+            pair_mean = self.pair_sums / self.pair_n
+            cov  = self.cross / self.pair_n - pair_mean * pair_mean.T
+            var  = np.clip(self.pair_sq / self.pair_n - pair_mean ** 2, 0, None)
+            corr = cov / np.sqrt(var * var.T)
+            band_means = self.band_sums / self.band_counts
+
+        ia, ie = self.columns.index('Attendance'), self.columns.index('Exam_Score')
+        # Least-squares trend line over every complete row, straight from the moments
+        slope = cov[ia, ie] / var[ia, ie] if var[ia, ie] > 0 else 0.0
+        intercept = pair_mean[ie, ia] - slope * pair_mean[ia, ie]
+
+        return {
+            'version':   version,
+            'total':     int(self.rows),
+            'avg_att':   float(mean[ia]),
+            'avg_score': float(mean[ie]),
+            'corr':      float(corr[ia, ie]),
+            'at_risk':   int(self.at_risk),
+            'bands': {
+                'labels': BAND_LABELS,
+                'counts': self.band_counts.tolist(),
+                'means':  band_means.tolist(),
+            },
+            'att_hist':   _value_hist(self.att_counts),
+            'score_hist': _value_hist(self.score_counts),
+            'corr_matrix': {'columns': self.columns, 'values': corr.tolist()},
+            'trend': {
+                'x':    self.sample_x.tolist(),
+                'y':    self.sample_y.tolist(),
+                'coef': [float(slope), float(intercept)],
+            },
+        }
+
+    def to_state(self):
+        return {
+            'columns':      self.columns,
+            'rows':         int(self.rows),
+            'pair_n':       self.pair_n.tolist(),
+            'pair_sums':    self.pair_sums.tolist(),
+            'pair_sq':      self.pair_sq.tolist(),
+            'cross':        self.cross.tolist(),
+            'band_counts':  self.band_counts.tolist(),
+            'band_sums':    self.band_sums.tolist(),
+            'at_risk':      int(self.at_risk),
+            'att_counts':   self.att_counts.tolist(),
+            'score_counts': self.score_counts.tolist(),
+            'seen':         int(self.seen),
+            'sample_x':     self.sample_x.tolist(),
+            'sample_y':     self.sample_y.tolist(),
+            'sample_ids':   self.sample_ids.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls(state['columns'])
+        agg.rows         = state['rows']
+        agg.pair_n       = np.asarray(state['pair_n'], dtype=np.float64)
+        agg.pair_sums    = np.asarray(state['pair_sums'], dtype=np.float64)
+        agg.pair_sq      = np.asarray(state['pair_sq'], dtype=np.float64)
+        agg.cross        = np.asarray(state['cross'], dtype=np.float64)
+        agg.band_counts  = np.asarray(state['band_counts'], dtype=np.int64)
+        agg.band_sums    = np.asarray(state['band_sums'], dtype=np.float64)
+        agg.at_risk      = state['at_risk']
+        agg.att_counts   = np.asarray(state['att_counts'], dtype=np.int64)
+        agg.score_counts = np.asarray(state['score_counts'], dtype=np.int64)
+        agg.seen         = state['seen']
+        agg.sample_x     = np.asarray(state['sample_x'], dtype=np.float64)
+        agg.sample_y     = np.asarray(state['sample_y'], dtype=np.float64)
+        agg.sample_ids   = np.asarray(state['sample_ids'], dtype=np.int64)
+        return agg
+
+
+def check_consistency(agg, df, rtol=1e-9):
+    """Compare `agg` against a from-scratch pandas recompute; return a list of mismatches."""
+    got = agg.summary()
+    cols = agg.columns
+    bins_cut = pd.cut(df['Attendance'], bins=BAND_EDGES)
+    band_means = df.groupby(bins_cut, observed=False)['Exam_Score'].mean().to_numpy()
+    expected = {
+        'total':     len(df),
+        'avg_att':   df['Attendance'].mean(),
+        'avg_score': df['Exam_Score'].mean(),
+        'corr':      df[['Attendance', 'Exam_Score']].corr().iloc[0, 1],
+        'at_risk':   int((df['Attendance'] < AT_RISK_THRESHOLD).sum()),
+    }
+
+    problems = []
+    for key, want in expected.items():
+        if not np.isclose(got[key], want, rtol=rtol, atol=0):
+            problems.append(f"{key}: incremental={got[key]!r} full={want!r}")
+    if not np.allclose(got['bands']['means'], band_means, rtol=rtol, atol=0, equal_nan=True):
+        problems.append(f"band means: incremental={got['bands']['means']} full={band_means.tolist()}")
+    full_corr = df[cols].corr().to_numpy()
+    if not np.allclose(got['corr_matrix']['values'], full_corr, rtol=1e-6, atol=1e-9, equal_nan=True):
+        problems.append("correlation matrix differs from DataFrame.corr()")
+    for key, col in (('att_hist', 'Attendance'), ('score_hist', 'Exam_Score')):
+        counts, _ = np.histogram(df[col].dropna(), bins=HIST_BINS)
+        if got[key]['counts'] != counts.tolist():
+            problems.append(f"{key}: bin counts differ from np.histogram")
+    return problems
+
+
+# ─── Persistence & append detection ─────────────────────────────────────────────
+def state_path(csv_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_DIR, f"aggregates_{stem}.json")
+
+
+def rows_path(csv_path, version):
+    """Summary columns of every row as of `version`, used to find edited rows."""
+    return os.path.splitext(state_path(csv_path))[0] + f"_{version[:16]}.npy"
+
+
+def _load_rows(path):
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _prefix_hash(path, nbytes, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        remaining = nbytes
+        while remaining > 0:
+            block = f.read(min(chunk_size, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def _read_tail(csv_path, offset, header):
+    with open(csv_path, 'rb') as f:
+        f.seek(offset)
+        tail = f.read()
+    if not tail.strip():
+        return pd.DataFrame(columns=header)
+    return pd.read_csv(io.BytesIO(tail), header=None, names=header)
+
+
+def _changed_rows(old, new):
+    """Positions where a row of `new` differs from the same row of `old` (NaN == NaN)."""
+    new = new[:len(old)]
+    same = (old == new) | (np.isnan(old) & np.isnan(new))
+    return np.flatnonzero(~same.all(axis=1))
+
+
+def refresh(csv_path, version, load_df):
+    """Bring the persisted aggregates up to `version` of the CSV and return them.
+
+    When the new file is the old file plus extra lines (its first `csv_size`
+    bytes hash to the previous version), only the appended rows are parsed
+    and added. Otherwise the file is loaded via `load_df()` and compared
+    row by row with the summary columns saved for the previous version:
+    edited rows (e.g. updated attendance) are replaced with `update()` and
+    rows past the old end are added, so the aggregates change in O(delta).
+    A changed header or removed rows trigger a full rebuild.
+    """
+    path = state_path(csv_path)
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+
+    if state and state.get('format') != STATE_FORMAT:
+        state = None   # written by an older layout of RunningAggregates: rebuild once
+
+    if state and state['version'] == version:
+        return RunningAggregates.from_state(state['aggregates'])
+
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    size = os.path.getsize(csv_path)
+    old_rows = _load_rows(rows_path(csv_path, state['version'])) if state else None
+    if state and size > state['csv_size'] \
+            and _prefix_hash(csv_path, state['csv_size']) == state['version']:
+        agg = RunningAggregates.from_state(state['aggregates'])
+        tail = _read_tail(csv_path, state['csv_size'], state['header'])
+        agg.add(tail)
+        rows = None if old_rows is None else np.concatenate(
+            [old_rows, tail[agg.columns].to_numpy(dtype=np.float64)])
+    else:
+        df = load_df()
+        agg = RunningAggregates.from_state(state['aggregates']) if state else None
+        if agg is not None and old_rows is not None and header == state['header'] \
+                and len(old_rows) <= len(df):
+            rows = df[agg.columns].to_numpy(dtype=np.float64)
+            changed = _changed_rows(old_rows, rows)
+            if len(changed):
+                agg.update(pd.DataFrame(old_rows[changed], columns=agg.columns),
+                           pd.DataFrame(rows[changed], columns=agg.columns), ids=changed)
+            if len(rows) > len(old_rows):
+                agg.add(pd.DataFrame(rows[len(old_rows):], columns=agg.columns))
+        else:
+            agg = RunningAggregates.from_frame(df)
+            rows = df[agg.columns].to_numpy(dtype=np.float64)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if rows is not None:
+        rows_file = rows_path(csv_path, version)
+        tmp = f"{rows_file}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, rows)
+        os.replace(tmp, rows_file)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'format': STATE_FORMAT, 'version': version, 'csv_size': size, 'header': header,
+                   'aggregates': agg.to_state()}, f)
+    os.replace(tmp, path)
+    stale = rows_path(csv_path, state['version']) if state else None
+    if stale and stale != rows_path(csv_path, version) and os.path.exists(stale):
+        os.remove(stale)
+    return agg
+
+
+if __name__ == "__main__":
+    # Consistency check of the persisted aggregates against a full recompute
+    agg = refresh(CSV_PATH, dataset_version(CSV_PATH), load_dataset)
+    issues = check_consistency(agg, load_dataset())
+    if issues:
+        print("❌ Aggregates out of sync:")
+        for issue in issues:
+            print(f"   {issue}")
+    else:
+        print(f"✅ Aggregates consistent with a full recompute ({agg.rows:,} rows)")
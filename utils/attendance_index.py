@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class _Partition:
+    """Row ids of one gender (or everyone) kept in Attendance and Exam_Score order."""
+
+    def __init__(self, ids, att, score):
+        by_att = np.argsort(att[ids], kind='stable')
+        self.by_att       = ids[by_att]
+        self.att_sorted   = att[self.by_att]
+        self.att_cumsum   = np.concatenate([[0], np.cumsum(self.att_sorted, dtype=np.int64)])
+        by_score = np.argsort(score[ids], kind='stable')
+        self.by_score     = ids[by_score]
+        self.att_by_score = att[self.by_score]
+
+    def bounds(self, att_min=None, att_max=None, below=None):
+        lo = 0 if att_min is None else np.searchsorted(self.att_sorted, att_min, side='left')
+        hi = len(self.att_sorted) if att_max is None else np.searchsorted(self.att_sorted, att_max, side='right')
+        if below is not None:
+            hi = min(hi, np.searchsorted(self.att_sorted, below, side='left'))
+        return int(lo), int(max(lo, hi))
+
+
+class AttendanceIndex:
+    """Per-dataset index for the portal/explorer range filters and sort orders.
+
+    Attendance ranges are `searchsorted` slices of a pre-sorted id array, so
+    counts and attendance-ordered listings never scan or copy the frame.
+    Row ids are positional (they index `df.iloc`).
+    """
+
+    def __init__(self, df):
+        att   = df['Attendance'].to_numpy()
+        score = df['Exam_Score'].to_numpy()
+        ids   = np.arange(len(df))
+        self.partitions = {'All': _Partition(ids, att, score)}
+        if 'Gender' in df.columns:
+            gender = df['Gender'].astype(object).to_numpy()
+            for g in sorted(df['Gender'].dropna().unique().tolist()):
+                self.partitions[g] = _Partition(ids[gender == g], att, score)
+
+    @property
+    def genders(self):
+        return [g for g in self.partitions if g != 'All']
+
+    def count(self, att_min=None, att_max=None, below=None, gender='All'):
+        """Number of rows in the attendance range — O(log n)."""
+        lo, hi = self.partitions[gender].bounds(att_min, att_max, below)
+        return hi - lo
+
+    def mean_attendance(self, att_min=None, att_max=None, below=None, gender='All'):
+        """Mean attendance over the range from prefix sums — O(log n)."""
+        part = self.partitions[gender]
+        lo, hi = part.bounds(att_min, att_max, below)
+        return (part.att_cumsum[hi] - part.att_cumsum[lo]) / (hi - lo) if hi > lo else 0.0
+
+    def select(self, att_min=None, att_max=None, below=None, gender='All',
+               order='Attendance', ascending=True):
+        """Row ids with `att_min <= Attendance <= att_max` (and `< below`), in `order`.
+
+        `order` is 'Attendance' (a view on the pre-sorted array), 'Exam_Score'
+        (one vectorized mask over the score-ordered ids) or None for row order.
+        """
+        part = self.partitions[gender]
+        lo, hi = part.bounds(att_min, att_max, below)
+        if order == 'Exam_Score':
+            if lo == hi:
+                ids = part.by_score[:0]
+            else:
+                low, high = part.att_sorted[lo], part.att_sorted[hi - 1]
+                ids = part.by_score[(part.att_by_score >= low) & (part.att_by_score <= high)]
+        elif order is None:
+            return np.sort(part.by_att[lo:hi])
+        else:
+            ids = part.by_att[lo:hi]
+        return ids if ascending else ids[::-1]
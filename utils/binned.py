@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_BINS       = 255   # real bins per column; uint8 code 255 marks a missing value
+MISSING        = 255
+VAL_FRACTION   = 0.2   # held-out rows used to report validation scores
+BINNED_ENTRIES = 8     # binned uploads kept per process
+
+# Gradient boosting defaults for subset models (no internal early stopping,
+# so every fit on the same bins is deterministic)
+HGB_PARAMS = {'max_iter': 100, 'learning_rate': 0.1, 'max_leaf_nodes': 31, 'random_state': 42}
+
+_lock   = threading.Lock()
+_binned = OrderedDict()   # data key -> BinnedData
+
+
+def quantile_edges(x, max_bins=MAX_BINS):
+    """Bin edges for `x`: midpoints between distinct values when there are few,
+    otherwise (deduplicated) quantiles."""
+    finite = x[~np.isnan(x)]
+    distinct = np.unique(finite)
+    if len(distinct) <= max_bins:
+        return (distinct[:-1] + distinct[1:]) / 2
+    return np.unique(np.quantile(finite, np.linspace(0, 1, max_bins + 1)[1:-1]))
+
+
+def bin_values(x, edges):
+    codes = np.searchsorted(edges, x, side='right').astype(np.uint8)
+    codes[np.isnan(x)] = MISSING
+    return codes
+
+
+def _as_features(codes):
+    """uint8 codes → float32 model input, with missing values back to NaN."""
+    X = codes.astype(np.float32)
+    X[codes == MISSING] = np.nan
+    return X
+
+
+class BinnedModel:
+    """A model trained on bin codes; `predict` bins raw feature values first."""
+
+    def __init__(self, model, edges, scores=None):
+        self.model  = model
+        self.edges  = edges
+        self.scores = scores   # validation r2 / mae and fit time, see BinnedData.fit_subset
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        codes = np.column_stack([bin_values(X[:, j], e) for j, e in enumerate(self.edges)])
+        return self.model.predict(_as_features(codes))
+
+
+class BinnedData:
+    """Every numeric candidate column of an upload, quantile-binned once into uint8 codes.
+
+    Subset models are trained straight from these codes with
+    HistGradientBoostingRegressor, so toggling features never re-runs
+    fillna/median or re-bins the raw data; missing values keep their own
+    bin instead of being imputed. A fixed train/validation split is drawn
+    once, so scores from different subsets are comparable. This backs the
+    custom panel's opt-in "fast preview"; its default model is still the
+    Random Forest.
+    """
+
+    def __init__(self, frame, columns, target='Exam_Score', val_fraction=VAL_FRACTION, seed=42):
+        self.columns = list(columns)
+        self.edges = {}
+        self.codes = np.empty((len(frame), len(self.columns)), dtype=np.uint8, order='F')
+        for j, col in enumerate(self.columns):
+            x = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.edges[col] = quantile_edges(x)
+            self.codes[:, j] = bin_values(x, self.edges[col])
+        self.y = frame[target].to_numpy(dtype=np.float64)
+
+        perm = np.random.default_rng(seed).permutation(len(frame))
+        n_val = int(len(frame) * val_fraction)
+        self.val_rows   = np.sort(perm[:n_val])
+        self.train_rows = np.sort(perm[n_val:])
+
+    def fit_subset(self, features, **params):
+        """Fit on the training rows using `features`; scored on the validation rows."""
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        from sklearn.metrics import mean_absolute_error, r2_score
+
+        t0 = time.perf_counter()
+        X = _as_features(self.codes[:, [self.columns.index(f) for f in features]])
+        model = HistGradientBoostingRegressor(early_stopping=False, **{**HGB_PARAMS, **params})
+        model.fit(X[self.train_rows], self.y[self.train_rows])
+        seconds = time.perf_counter() - t0
+
+        y_val, pred = self.y[self.val_rows], model.predict(X[self.val_rows])
+        scores = {
+            'r2':      float(r2_score(y_val, pred)),
+            'mae':     float(mean_absolute_error(y_val, pred)),
+            'seconds': seconds,
+            'n_val':   len(self.val_rows),
+        }
+        return BinnedModel(model, [self.edges[f] for f in features], scores)
+
+
+def get_binned(key, build):
+    """Shared BinnedData for `key` (e.g. the upload hash), calling `build()` on a miss."""
+    with _lock:
+        binned = _binned.get(key)
+        if binned is not None:
+            _binned.move_to_end(key)
+            return binned
+    binned = build()
+    with _lock:
+        _binned[key] = binned
+        while len(_binned) > BINNED_ENTRIES:
+            _binned.popitem(last=False)
+    return binned
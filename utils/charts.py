@@ -0,0 +1,126 @@
+import numpy as np
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from utils.summary import corr_frame
+
+# Dashboard charts drawn from the summary snapshot (utils/summary.py).
+# They build plain `Figure`s rather than going through pyplot, so rendering
+# keeps no global state and is safe from concurrent Streamlit sessions.
+
+BG = '#1a1e2b'
+
+
+def _figure(figsize):
+    fig = Figure(figsize=figsize, facecolor=BG)
+    ax = fig.subplots()
+    ax.set_facecolor(BG)
+    return fig, ax
+
+
+def trend(summary):
+    """Attendance vs Exam Score scatter with the trend line and 75% threshold."""
+    trend = summary['trend']
+    fig, ax = _figure((9, 5))
+
+    ax.scatter(trend['x'], trend['y'],
+               alpha=0.25, s=18, color='#4f8ef7', linewidths=0)
+
+    # Trend line
+    p = np.poly1d(trend['coef'])
+    x_line = np.linspace(min(trend['x']), max(trend['x']), 200)
+    ax.plot(x_line, p(x_line), color='#a78bfa', linewidth=2.5, label='Trend Line')
+
+    # 75% threshold line
+    ax.axvline(75, color='#f87171', linewidth=1.5, linestyle='--', alpha=0.7, label='75% Attendance Threshold')
+
+    ax.set_xlabel('Attendance (%)', color='#64748b', fontsize=11)
+    ax.set_ylabel('Exam Score', color='#64748b', fontsize=11)
+    ax.set_title('', color='#e2e8f0')
+    ax.tick_params(colors='#64748b')
+    for spine in ax.spines.values(): spine.set_edgecolor('#252a3a')
+    ax.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=10)
+    ax.grid(True, alpha=0.08, color='white')
+    fig.tight_layout()
+    return fig
+
+
+def band_means(summary):
+    """Average exam score per attendance band (empty bands are skipped)."""
+    bands       = summary['bands']
+    observed    = [i for i, c in enumerate(bands['counts']) if c > 0]
+    bins_label  = [bands['labels'][i] for i in observed]
+    group_means = [bands['means'][i] for i in observed]
+    colors_bar  = [['#f87171', '#fb923c', '#facc15', '#34d399'][i] for i in observed]
+
+    fig, ax = _figure((5, 2.8))
+    bars = ax.bar(bins_label, group_means, color=colors_bar, width=0.55, edgecolor='none', zorder=3)
+    for bar, val in zip(bars, group_means):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.3,
+                f'{val:.1f}', ha='center', va='bottom', color='#e2e8f0', fontsize=9)
+    ax.set_ylabel('Avg Score', color='#64748b', fontsize=9)
+    ax.tick_params(colors='#64748b', labelsize=8)
+    for spine in ax.spines.values(): spine.set_edgecolor('#252a3a')
+    ax.grid(axis='y', alpha=0.08, color='white', zorder=0)
+    ax.set_ylim(0, max(group_means, default=0) + 8)
+    fig.tight_layout()
+    return fig
+
+
+def attendance_hist(summary):
+    fig, ax = _figure((4.5, 3))
+    h = summary['att_hist']
+    ax.hist(h['edges'][:-1], bins=h['edges'], weights=h['counts'], color='#4f8ef7', alpha=0.8, edgecolor='none')
+    ax.axvline(75, color='#f87171', linewidth=1.5, linestyle='--', label='75% line')
+    ax.set_title('Attendance Distribution', color='#e2e8f0', fontsize=11)
+    ax.tick_params(colors='#64748b', labelsize=8)
+    for spine in ax.spines.values(): spine.set_edgecolor('#252a3a')
+    ax.grid(alpha=0.07, color='white')
+    ax.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=8)
+    fig.tight_layout()
+    return fig
+
+
+def score_hist(summary):
+    fig, ax = _figure((4.5, 3))
+    h = summary['score_hist']
+    ax.hist(h['edges'][:-1], bins=h['edges'], weights=h['counts'], color='#a78bfa', alpha=0.8, edgecolor='none')
+    ax.set_title('Exam Score Distribution', color='#e2e8f0', fontsize=11)
+    ax.tick_params(colors='#64748b', labelsize=8)
+    for spine in ax.spines.values(): spine.set_edgecolor('#252a3a')
+    ax.grid(alpha=0.07, color='white')
+    fig.tight_layout()
+    return fig
+
+
+def heatmap(summary):
+    """Numeric feature correlation heatmap (Data Explorer)."""
+    fig, ax = _figure((6, 5))
+    sns.heatmap(corr_frame(summary), annot=True, fmt='.2f', cmap='coolwarm',
+                ax=ax, linewidths=0.5, linecolor='#13161e',
+                annot_kws={'size': 9, 'color': 'white'},
+                cbar_kws={'shrink': 0.8})
+    ax.tick_params(colors='#e2e8f0', labelsize=9)
+    ax.set_title('Numeric Feature Correlations', color='#e2e8f0', pad=12)
+    fig.tight_layout()
+    return fig
+
+
+def response_surface(xs, ys, surface, base, xlabel, ylabel):
+    """Predicted score over two swept inputs (utils/scenarios.sweep), with the current student marked."""
+    fig, ax = _figure((6, 4))
+    mesh = ax.pcolormesh(xs, ys, surface, cmap='viridis', shading='auto')
+    contours = ax.contour(xs, ys, surface, levels=6, colors='white', linewidths=0.6, alpha=0.6)
+    ax.clabel(contours, fontsize=7, fmt='%.0f')
+    ax.scatter([base[0]], [base[1]], color='#f87171', s=40, zorder=5, label='Current')
+    ax.set_xlabel(xlabel, color='#64748b', fontsize=9)
+    ax.set_ylabel(ylabel, color='#64748b', fontsize=9)
+    ax.tick_params(colors='#64748b', labelsize=8)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    cbar = fig.colorbar(mesh, ax=ax)
+    cbar.ax.tick_params(colors='#64748b', labelsize=8)
+    cbar.set_label('Predicted Score', color='#64748b', fontsize=9)
+    ax.legend(facecolor='#252a3a', edgecolor='#252a3a', labelcolor='#e2e8f0', fontsize=8)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,169 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils.preprocess import CATEGORICAL_COLS
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+CSV_PATH  = 'data/StudentPerformanceFactors.csv'
+CACHE_DIR = 'data/.cache'
+
+# abs path -> ((size, mtime_ns), sha1); only consulted without pyarrow, where
+# ensure_cache's metadata file is not available to remember the hash
+_hash_lock = threading.Lock()
+_hashes    = {}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 of a file's bytes, read in chunks so large CSVs never sit in memory."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def compact_dtypes(df):
+    """Downcast integer columns to int8/int16 and store the categoricals as `category`."""
+    df = df.copy()
+    for col in df.columns:
+        if col in CATEGORICAL_COLS:
+            df[col] = df[col].astype('category')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def _cache_paths(csv_path):
+    # Stem for readability plus a hash of the absolute path, so same-named CSVs
+    # in different directories never share a cache file
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    tag = hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:8]
+    return (os.path.join(CACHE_DIR, f"{stem}_{tag}.parquet"),
+            os.path.join(CACHE_DIR, f"{stem}_{tag}.meta.json"))
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, write_fn):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write_fn(tmp)
+    os.replace(tmp, path)
+
+
+def prune_siblings(keep, pattern):
+    """Delete files matching `pattern` (a glob under CACHE_DIR) other than `keep`.
+
+    Called after writing the cache file for the current version so files of
+    older dataset/model versions do not pile up. Processes still holding an
+    old file memory-mapped keep reading it until they move on.
+    """
+    for path in glob.glob(os.path.join(CACHE_DIR, pattern)):
+        if path != keep and not path.endswith('.tmp'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass   # already removed by another process
+
+
+def _write_json(path, obj):
+    def _dump(p):
+        with open(p, 'w') as f:
+            json.dump(obj, f)
+    _write_atomic(path, _dump)
+
+
+def _build_cache(csv_path, parquet_path, meta_path, stat, sha1):
+    df = compact_dtypes(pd.read_csv(csv_path))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _write_atomic(parquet_path, lambda p: df.to_parquet(p, index=False))
+    meta = {
+        'csv_size':     stat.st_size,
+        'csv_mtime_ns': stat.st_mtime_ns,
+        'sha1':         sha1,
+        'rows':         len(df),
+        'columns':      list(df.columns),
+    }
+    _write_json(meta_path, meta)
+    return meta
+
+
+def ensure_cache(csv_path=CSV_PATH):
+    """Return the cache metadata for `csv_path`, converting the CSV to Parquet if it changed.
+
+    The size/mtime pair is checked first; the content hash is only computed when
+    the file was touched, so an unchanged CSV costs a single `stat` call.
+    """
+    parquet_path, meta_path = _cache_paths(csv_path)
+    stat = os.stat(csv_path)
+    meta = _read_meta(meta_path)
+    has_parquet = os.path.exists(parquet_path)
+
+    if meta and has_parquet and meta['csv_size'] == stat.st_size \
+            and meta['csv_mtime_ns'] == stat.st_mtime_ns:
+        return meta
+
+    sha1 = file_hash(csv_path)
+    if meta and has_parquet and meta['sha1'] == sha1:
+        # Touched but not edited — refresh the stat fingerprint only
+        meta.update(csv_size=stat.st_size, csv_mtime_ns=stat.st_mtime_ns)
+        _write_json(meta_path, meta)
+        return meta
+
+    return _build_cache(csv_path, parquet_path, meta_path, stat, sha1)
+
+
+def dataset_version(csv_path=CSV_PATH):
+    """Content hash of the CSV; changes whenever the data does.
+
+    Re-hashed only when the file's size/mtime change, so calling this on
+    every rerun costs a `stat`.
+    """
+    if HAS_ARROW:
+        return ensure_cache(csv_path)['sha1']
+    stat = os.stat(csv_path)
+    fingerprint = (stat.st_size, stat.st_mtime_ns)
+    key = os.path.abspath(csv_path)
+    with _hash_lock:
+        cached = _hashes.get(key)
+    if cached is None or cached[0] != fingerprint:
+        cached = (fingerprint, file_hash(csv_path))
+        with _hash_lock:
+            _hashes[key] = cached
+    return cached[1]
+
+
+def load_dataset(columns=None, csv_path=CSV_PATH):
+    """Load the student dataset with compact dtypes, optionally only `columns`.
+
+    Columns that do not exist in the file are skipped, so callers can ask for
+    optional ones (e.g. `Name`) and test for them afterwards.
+    """
+    if not HAS_ARROW:
+        usecols = None
+        if columns is not None:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            usecols = [c for c in columns if c in header]
+        df = compact_dtypes(pd.read_csv(csv_path, usecols=usecols))
+        return df if usecols is None else df[usecols]
+
+    meta = ensure_cache(csv_path)
+    if columns is not None:
+        columns = [c for c in columns if c in meta['columns']]
+    parquet_path, _ = _cache_paths(csv_path)
+    return pd.read_parquet(parquet_path, columns=columns)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import time
+import zlib
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+from utils.dataset import CACHE_DIR
+
+EXPORT_CHUNK   = 50_000   # rows materialized at a time
+EXPORT_DIR     = os.path.join(CACHE_DIR, 'exports')
+EXPORT_MAX_AGE = 3600     # seconds a prepared download is kept on disk
+# st.download_button reads the whole file into the session's media store, so the
+# chunked writer bounds memory while preparing but not while serving: cap the size
+EXPORT_MAX_BYTES = 100 << 20
+
+# label -> (file extension, mime type)
+FORMATS = {
+    'CSV':        ('csv',     'text/csv'),
+    'CSV (gzip)': ('csv.gz',  'application/gzip'),
+    'Parquet':    ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def available_formats():
+    return [f for f in FORMATS if f != 'Parquet' or HAS_ARROW]
+
+
+def prune_exports(max_age=EXPORT_MAX_AGE, export_dir=EXPORT_DIR):
+    """Delete prepared downloads older than `max_age` seconds (abandoned sessions included)."""
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(export_dir)
+    except OSError:
+        return 0
+    removed = 0
+    for name in names:
+        path = os.path.join(export_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass   # already removed by another session
+    return removed
+
+
+def new_export_path(ext, export_dir=EXPORT_DIR):
+    """A fresh file under `export_dir` for one prepared download; stale ones are pruned first."""
+    prune_exports(export_dir=export_dir)
+    os.makedirs(export_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f".{ext}", dir=export_dir)
+    os.close(fd)
+    return path
+
+
+def iter_frames(make_frame, ids, chunk_rows=EXPORT_CHUNK):
+    """Yield `make_frame(ids_chunk)` for consecutive slices of `ids`."""
+    if len(ids) == 0:
+        yield make_frame(ids[:0])   # still emit the header / schema
+    for start in range(0, len(ids), chunk_rows):
+        yield make_frame(ids[start:start + chunk_rows])
+
+
+def iter_csv(frames):
+    """UTF-8 CSV bytes, one piece per frame; the header is written once."""
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+
+def iter_gzip(pieces, level=6):
+    """Gzip-compress a stream of byte pieces without buffering the whole output."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits=31 → gzip container
+    for piece in pieces:
+        out = compressor.compress(piece)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def write_parquet(frames, path):
+    """Write frames as row groups of a single Parquet file."""
+    writer = None
+    try:
+        for frame in frames:
+            if writer is None:
+                table  = pa.Table.from_pandas(frame, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export(make_frame, ids, fmt, out, chunk_rows=EXPORT_CHUNK):
+    """Stream the rows `ids` (built chunk by chunk by `make_frame`) to `out` in `fmt`.
+
+    `out` is a path for Parquet, or a path / binary file object for CSV. Peak
+    memory is bounded by one chunk, whatever the number of rows.
+    """
+    frames = iter_frames(make_frame, ids, chunk_rows)
+    if fmt == 'Parquet':
+        write_parquet(frames, out)
+        return
+    pieces = iter_csv(frames)
+    if fmt == 'CSV (gzip)':
+        pieces = iter_gzip(pieces)
+    if isinstance(out, str):
+        with open(out, 'wb') as f:
+            for piece in pieces:
+                f.write(piece)
+    else:
+        for piece in pieces:
+            out.write(piece)
@@ -0,0 +1,56 @@
+import io
+import threading
+from collections import OrderedDict
+
+FIG_CACHE_BYTES = 64 << 20   # size budget for all cached images
+FIG_DPI         = 200        # same resolution st.pyplot renders at
+
+# Process-wide LRU of rendered chart images: key -> PNG bytes
+_lock  = threading.Lock()
+_cache = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+
+def render_png(fig, dpi=FIG_DPI):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
+    return buf.getvalue()
+
+
+def cached_png(key, draw, budget=FIG_CACHE_BYTES):
+    """PNG bytes for chart `key`, calling `draw()` → Figure only on a miss.
+
+    `key` should identify everything the image depends on, e.g.
+    `(dataset_version, 'trend', params)`. Least recently used images are
+    evicted once the total size exceeds `budget`.
+    """
+    with _lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return png
+        _stats['misses'] += 1
+
+    png = render_png(draw())
+
+    with _lock:
+        if key not in _cache:
+            _cache[key] = png
+            _stats['bytes'] += len(png)
+        while _stats['bytes'] > budget and len(_cache) > 1:
+            _, old = _cache.popitem(last=False)
+            _stats['bytes'] -= len(old)
+            _stats['evictions'] += 1
+    return png
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, evictions=0, bytes=0)
@@ -0,0 +1,110 @@
+import os
+import sys
+from itertools import product
+
+import joblib
+import numpy as np
+
+GRID_PATH = 'model/model_grid.joblib'
+
+# Input lattice of the default model, in preprocess_data's feature order
+GRID_FEATURES = ['Attendance', 'Hours_Studied', 'Previous_Scores', 'Tutoring_Sessions']
+GRID_BOUNDS   = [(0, 100), (0, 50), (0, 100), (0, 10)]   # same ranges as the estimator inputs
+ERROR_SAMPLES = 20_000   # random lattice points checked against the live model
+# Largest measured |grid − model| (marks) at which an interpolating grid is still served
+GRID_TOLERANCE = float(os.environ.get('EDUINSIGHT_GRID_TOLERANCE', '0.5'))
+
+
+def axis_values(lo, hi, step):
+    """lo, lo+step, ... with `hi` always included as the last point."""
+    values = np.arange(lo, hi + 1, step, dtype=np.float64)
+    if values[-1] != hi:
+        values = np.append(values, hi)
+    return values
+
+
+class GridModel:
+    """The default model precomputed over its whole (or a coarsened) input lattice.
+
+    With `step=1` every integer input combination is stored, so predicting an
+    in-range integer row is a single array lookup. With a larger step only
+    every `step`-th value per axis is kept and predictions are multilinearly
+    interpolated between the 2^4 surrounding lattice points. Inputs outside
+    the lattice are clipped to its bounds.
+    """
+
+    def __init__(self, predict, step=1, source=None, bounds=GRID_BOUNDS):
+        self.axes   = [axis_values(lo, hi, step) for lo, hi in bounds]
+        self.step   = int(step)
+        self.source = source    # hash of the model.pkl this was computed from
+        shape = tuple(len(a) for a in self.axes)
+        self.values = np.empty(shape, dtype=np.float32)
+        # One predict call per first-axis value keeps the batch bounded (~57k rows at step=1)
+        rest = np.stack(np.meshgrid(*self.axes[1:], indexing='ij'), axis=-1).reshape(-1, len(shape) - 1)
+        for i, x0 in enumerate(self.axes[0]):
+            X = np.column_stack([np.full(len(rest), x0), rest])
+            self.values[i] = np.asarray(predict(X)).reshape(shape[1:])
+        self.max_error = self.mean_error = None
+
+    @property
+    def exact(self):
+        return self.step == 1
+
+    def within(self, tolerance=GRID_TOLERANCE):
+        """Whether this grid may stand in for the model: exact, or measured within `tolerance`."""
+        return self.exact or (self.max_error is not None and self.max_error <= tolerance)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        lo = np.array([a[0] for a in self.axes])
+        hi = np.array([a[-1] for a in self.axes])
+        X = np.clip(X, lo, hi)
+
+        if self.exact and np.array_equal(X, np.round(X)):
+            return self.values[tuple((X - lo).astype(np.intp).T)].astype(np.float64)
+
+        # Lower corner index and fractional offset along every axis
+        idx, frac = [], []
+        for d, axis in enumerate(self.axes):
+            i = np.clip(np.searchsorted(axis, X[:, d], side='right') - 1, 0, len(axis) - 2)
+            idx.append(i)
+            frac.append((X[:, d] - axis[i]) / (axis[i + 1] - axis[i]))
+
+        out = np.zeros(len(X))
+        for corner in product((0, 1), repeat=len(self.axes)):
+            weight = np.ones(len(X))
+            for d, c in enumerate(corner):
+                weight *= frac[d] if c else 1 - frac[d]
+            out += weight * self.values[tuple(i + c for i, c in zip(idx, corner))]
+        return out
+
+    def measure_error(self, predict, n=ERROR_SAMPLES, seed=0):
+        """Max / mean |grid − model| over `n` random in-range integer inputs."""
+        rng = np.random.default_rng(seed)
+        X = np.column_stack([rng.integers(a[0], a[-1] + 1, n) for a in self.axes]).astype(np.float64)
+        err = np.abs(self.predict(X) - np.asarray(predict(X)))
+        self.max_error, self.mean_error = float(err.max()), float(err.mean())
+        return self.max_error
+
+
+def compile_and_save(predict, step=1, source=None, path=GRID_PATH):
+    grid = GridModel(predict, step, source)
+    grid.measure_error(predict)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(grid, tmp)
+    os.replace(tmp, path)
+    return grid
+
+
+if __name__ == "__main__":
+    grid = joblib.load(sys.argv[1] if len(sys.argv) > 1 else GRID_PATH, mmap_mode='r')
+    print(f"Lattice: {' × '.join(str(len(a)) for a in grid.axes)} (step {grid.step}), "
+          f"{grid.nbytes / 1e6:.1f} MB")
+    print(f"Max |error| vs model : {grid.max_error:.4f}")
+    print(f"Mean |error| vs model: {grid.mean_error:.4f}")
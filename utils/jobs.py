@@ -0,0 +1,58 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+TRAIN_STEPS   = 10   # warm-start rounds per fit (progress / cancellation granularity)
+TRAIN_WORKERS = 2    # concurrent fits across all sessions of this process
+
+# Tree fitting releases the GIL, so a thread pool keeps the Streamlit script
+# responsive without copying the training data into another process.
+_executor = ThreadPoolExecutor(max_workers=TRAIN_WORKERS, thread_name_prefix='retrain')
+
+
+class TrainJob:
+    """Fit a RandomForestRegressor in the background with progress and cancellation.
+
+    The forest is grown with `warm_start` in `steps` rounds, so `progress` is
+    updated and a pending `cancel()` is honoured between rounds. Growing it
+    this way gives the same trees as a single `fit` with the same
+    `random_state`. `meta` is carried along untouched for the caller.
+    """
+
+    def __init__(self, key, X, y, meta=None, n_estimators=100, steps=TRAIN_STEPS, **params):
+        self.key      = key
+        self.meta     = meta
+        self.status   = 'pending'   # pending → running → done | cancelled | failed
+        self.progress = 0.0
+        self.model    = None
+        self.error    = None
+        self._cancel  = threading.Event()
+        self._future  = _executor.submit(self._run, X, y, n_estimators, steps, params)
+
+    def _run(self, X, y, n_estimators, steps, params):
+        from sklearn.ensemble import RandomForestRegressor
+        try:
+            model = RandomForestRegressor(warm_start=True, **params)
+            self.status = 'running'
+            for step in range(1, steps + 1):
+                if self._cancel.is_set():
+                    self.status = 'cancelled'
+                    return
+                model.set_params(n_estimators=math.ceil(n_estimators * step / steps))
+                model.fit(X, y)
+                self.progress = step / steps
+            model.set_params(warm_start=False)
+            self.model  = model
+            self.status = 'done'
+        except Exception as e:
+            self.error  = e
+            self.status = 'failed'
+
+    def cancel(self):
+        self._cancel.set()
+        if self._future.cancel():   # had not started yet
+            self.status = 'cancelled'
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'cancelled', 'failed')
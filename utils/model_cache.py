@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from utils.dataset import CACHE_DIR
+
+MODEL_CACHE_BYTES = 256 << 20                          # in-memory budget for all cached models
+MODEL_CACHE_DIR   = os.path.join(CACHE_DIR, 'models')  # where evicted models are spilled
+
+# Process-wide LRU of fitted custom models: key -> (model, size in bytes)
+_lock  = threading.Lock()
+_cache = OrderedDict()
+_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+
+def model_key(data_hash, features, params):
+    """Stable key for a model trained on `data_hash` with `features` and `params`.
+
+    Feature order and parameter order do not matter.
+    """
+    raw = repr((data_hash, tuple(sorted(features)), tuple(sorted(params.items()))))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _spill_path(key):
+    return os.path.join(MODEL_CACHE_DIR, f"{key}.joblib")
+
+
+def _nbytes(model):
+    """Approximate in-memory size; forests are measured from their node arrays."""
+    trees = [est.tree_ for est in getattr(model, 'estimators_', [])]
+    if trees and all(hasattr(t, '__getstate__') for t in trees):
+        return sum(t.__getstate__()['nodes'].nbytes + t.value.nbytes for t in trees)
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _spill(key, model):
+    path = _spill_path(key)
+    if os.path.exists(path):
+        return
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+
+
+def get(key, spill=True):
+    """The cached model for `key` from memory (or from its spill file), else None."""
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return cached[0]
+    path = _spill_path(key)
+    if spill and os.path.exists(path):
+        try:
+            model = joblib.load(path)
+        except Exception:
+            model = None
+        if model is not None:
+            with _lock:
+                _stats['disk_hits'] += 1
+            put(key, model, spill)
+            return model
+    with _lock:
+        _stats['misses'] += 1
+    return None
+
+
+def put(key, model, spill=True, budget=MODEL_CACHE_BYTES):
+    """Add `model`; least recently used models beyond `budget` are evicted
+    (and written to disk first when `spill` is on)."""
+    size = _nbytes(model)
+    evicted = []
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return
+        _cache[key] = (model, size)
+        _stats['bytes'] += size
+        while _stats['bytes'] > budget and len(_cache) > 1:
+            old_key, (old_model, old_size) = _cache.popitem(last=False)
+            _stats['bytes'] -= old_size
+            _stats['evictions'] += 1
+            evicted.append((old_key, old_model))
+    if spill:
+        for old_key, old_model in evicted:
+            _spill(old_key, old_model)
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, disk_hits=0, misses=0, evictions=0, bytes=0)
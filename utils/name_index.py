@@ -0,0 +1,157 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.dataset import CACHE_DIR, prune_siblings
+
+BUILD_CHUNK = 100_000   # distinct names encoded per step (bounds build memory)
+GATHER_LOOP = 256       # below this many matched names, gather rows slice by slice
+
+
+def _gram_key(a, b, c):
+    # Three code points (< 2**21 each) packed into one int64
+    return (a << 42) | (b << 21) | c
+
+
+def _query_grams(q):
+    cps = [ord(ch) for ch in q]
+    return sorted({_gram_key(cps[i], cps[i + 1], cps[i + 2]) for i in range(len(cps) - 2)})
+
+
+def _name_grams(names, start):
+    """(gram_key, name_id) pairs for a chunk of lowercase names, fully vectorized."""
+    width = max(3, int(np.char.str_len(names).max()) if len(names) else 3)
+    arr = np.asarray(names, dtype=f'<U{width}')
+    cps = arr.view(np.uint32).reshape(len(arr), width).astype(np.int64)
+    keys = _gram_key(cps[:, :-2], cps[:, 1:-1], cps[:, 2:])
+    valid = np.arange(width - 2)[None, :] < (np.char.str_len(arr) - 2)[:, None]
+    rows, cols = np.nonzero(valid)
+    return keys[rows, cols], rows + start
+
+
+class NameIndex:
+    """Trigram inverted index over the `Name` column.
+
+    Names are lower-cased and de-duplicated first (cohorts reuse the same
+    names a lot), then every trigram maps to the sorted ids of the distinct
+    names containing it. Row ids are positional, i.e. they index `df.iloc`.
+    """
+
+    def __init__(self, names):
+        lower = pd.Series(names).str.lower()
+        codes, uniques = pd.factorize(lower)
+        self.codes = codes.astype(np.int32)
+        self.names = np.asarray(uniques, dtype=str)
+
+        # Distinct name → rows (CSR); the stable sort keeps rows ascending
+        order = np.argsort(self.codes, kind='stable')
+        order = order[self.codes[order] >= 0]
+        self.row_order = order.astype(np.int64)
+        self.row_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.codes[order], minlength=len(self.names)))])
+
+        # Original spelling of each distinct name (first occurrence)
+        original = np.asarray(names, dtype=object)
+        first = self.row_order[self.row_ptr[:-1]] if len(self.names) else np.zeros(0, dtype=np.int64)
+        self.display = np.asarray(original[first], dtype=str)
+
+        # Trigram → distinct-name postings (CSR, sorted by gram then id)
+        keys, ids = [], []
+        for start in range(0, len(self.names), BUILD_CHUNK):
+            k, i = _name_grams(self.names[start:start + BUILD_CHUNK], start)
+            keys.append(k)
+            ids.append(i)
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        ids = np.concatenate(ids).astype(np.int32) if ids else np.zeros(0, dtype=np.int32)
+        order = np.lexsort((ids, keys))
+        keys, ids = keys[order], ids[order]
+        first_of_pair = np.ones(len(keys), dtype=bool)
+        first_of_pair[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+        keys, ids = keys[first_of_pair], ids[first_of_pair]
+
+        self.gram_keys, starts = np.unique(keys, return_index=True)
+        self.gram_ptr = np.append(starts, len(keys)).astype(np.int64)
+        self.gram_ids = ids
+        self.gram_count = np.bincount(ids, minlength=len(self.names))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _postings(self, key):
+        i = np.searchsorted(self.gram_keys, key)
+        if i < len(self.gram_keys) and self.gram_keys[i] == key:
+            return self.gram_ids[self.gram_ptr[i]:self.gram_ptr[i + 1]]
+        return self.gram_ids[:0]
+
+    def _rows(self, name_ids):
+        if len(name_ids) <= GATHER_LOOP:
+            parts = [self.row_order[self.row_ptr[u]:self.row_ptr[u + 1]] for u in name_ids]
+            return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+        hit = np.zeros(len(self.names) + 1, dtype=bool)   # last slot catches NaN names (code -1)
+        hit[name_ids] = True
+        return np.flatnonzero(hit[self.codes])
+
+    def match_names(self, query):
+        """Ids of distinct names containing `query` (case-insensitive, literal)."""
+        q = query.strip().lower()
+        if not q:
+            return np.arange(len(self.names))
+        grams = _query_grams(q)
+        if not grams:
+            # 1–2 characters: too short for trigrams, scan the distinct names instead
+            return np.flatnonzero(np.char.find(self.names, q) >= 0)
+
+        postings = sorted((self._postings(g) for g in grams), key=len)
+        candidates = postings[0]
+        for p in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, p, assume_unique=True)
+        if len(grams) > 1 and len(candidates):
+            # Trigrams can co-occur without being contiguous — confirm the substring
+            candidates = candidates[np.char.find(self.names[candidates], q) >= 0]
+        return candidates
+
+    def search(self, query):
+        """Sorted row ids whose name contains `query` — the indexed `str.contains`."""
+        return self._rows(self.match_names(query))
+
+    def fuzzy(self, query, limit=5, min_score=0.3):
+        """Closest names by trigram Jaccard similarity, best first.
+
+        Returns `(name, score, row_ids)` tuples, so a misspelt query such as
+        "Deepak Bht" still surfaces "Deepak Bhatt".
+        """
+        grams = _query_grams(query.strip().lower())
+        if not grams:
+            return []
+        hits = np.concatenate([self._postings(g) for g in grams])
+        if len(hits) == 0:
+            return []
+        ids, shared = np.unique(hits, return_counts=True)
+        score = shared / (len(grams) + self.gram_count[ids] - shared)
+        top = np.argsort(-score, kind='stable')[:limit]
+        return [(str(self.display[ids[t]]), float(score[t]), self._rows([ids[t]]))
+                for t in top if score[t] >= min_score]
+
+
+def index_path(version):
+    return os.path.join(CACHE_DIR, f"names_{version[:16]}.joblib")
+
+
+def load_or_build(version, load_names):
+    """Load the persisted index for `version` (memory-mapped), building it on a miss."""
+    path = index_path(version)
+    if os.path.exists(path):
+        try:
+            return joblib.load(path, mmap_mode='r')
+        except Exception:
+            pass
+    index = NameIndex(load_names())
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(index, tmp)
+    os.replace(tmp, path)
+    prune_siblings(path, 'names_*.joblib')
+    return index
@@ -0,0 +1,32 @@
+import math
+
+import numpy as np
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+SEVERITY_BANDS  = [60, 65, 75]
+SEVERITY_LABELS = ["🔴 Critical", "🟠 High Risk", "🟡 At Risk"]
+SEVERITY_OK     = "🟢 OK"
+
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+def page_slice(ids, page, page_size):
+    """Ids on 1-based `page` — a view, so paging never copies the full id array."""
+    page  = min(max(1, int(page)), page_count(len(ids), page_size))
+    start = (page - 1) * page_size
+    return ids[start:start + page_size]
+
+
+def take(df, ids, columns):
+    """Materialize only `ids` × `columns` of `df` (positional ids)."""
+    positions = [df.columns.get_loc(c) for c in columns]
+    return df.iloc[np.asarray(ids), positions].reset_index(drop=True)
+
+
+def severity(attendance):
+    """Vectorized attendance status badge (<60 Critical, <65 High Risk, <75 At Risk)."""
+    att = np.asarray(attendance)
+    return np.select([att < b for b in SEVERITY_BANDS], SEVERITY_LABELS, default=SEVERITY_OK)
@@ -0,0 +1,212 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from utils.dataset import CACHE_DIR
+
+PERF_RUNS  = 200                                # reruns kept in the ring buffer
+PERF_DIR   = os.path.join(CACHE_DIR, 'perf')
+JSONL_PATH = os.path.join(PERF_DIR, 'metrics.jsonl')
+PROM_PATH  = os.path.join(PERF_DIR, 'metrics.prom')
+
+# Set EDUINSIGHT_PERF=0 to start with instrumentation off
+_enabled = os.environ.get('EDUINSIGHT_PERF', '1') != '0'
+_lock    = threading.Lock()
+_runs    = deque(maxlen=PERF_RUNS)   # finished reruns, oldest first
+_local   = threading.local()         # the rerun being recorded on this script thread
+_dumped  = 0                         # id of the last run appended to the JSONL file
+_next_id = 0
+
+_PAGE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _rss():
+    """Resident set size in bytes (0 where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('run', 'name', 'depth', 't0', 'rss0')
+
+    def __init__(self, run, name):
+        self.run  = run
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.run['_depth']
+        self.run['_depth'] += 1
+        # RSS costs a /proc read, so only top-level spans sample it
+        self.rss0 = _rss() if self.depth == 0 else None
+        self.t0   = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.t0) * 1e3
+        self.run['_depth'] -= 1
+        self.run['spans'].append({
+            'name':         self.name,
+            'depth':        self.depth,
+            'ms':           ms,
+            'rss_delta_mb': (_rss() - self.rss0) / 1e6 if self.rss0 is not None else None,
+        })
+        return False
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def begin_run(label='rerun'):
+    """Start recording a rerun on this thread (an unfinished previous one is dropped)."""
+    global _next_id
+    if not _enabled:
+        _local.run = None
+        return
+    with _lock:
+        _next_id += 1
+        run_id = _next_id
+    _local.run = {'id': run_id, 'label': label, 'start': time.time(), 'spans': [],
+                  '_depth': 0, '_t0': time.perf_counter(), '_rss0': _rss()}
+
+
+def end_run():
+    """Finish the current rerun and push it into the ring buffer."""
+    run = getattr(_local, 'run', None)
+    _local.run = None
+    if run is None:
+        return None
+    run['total_ms'] = (time.perf_counter() - run.pop('_t0')) * 1e3
+    run['rss_mb'] = _rss() / 1e6
+    run['rss_delta_mb'] = run['rss_mb'] - run.pop('_rss0') / 1e6
+    run.pop('_depth')
+    with _lock:
+        _runs.append(run)
+    return run
+
+
+def span(name):
+    """Context manager timing a section of the current rerun; a shared no-op when
+    instrumentation is off or nothing is being recorded (fragment reruns, scripts)."""
+    run = getattr(_local, 'run', None) if _enabled else None
+    if run is None:
+        return _NO_SPAN
+    return _Span(run, name)
+
+
+def fragment(name):
+    """Decorator for `st.fragment` functions so their reruns are recorded too.
+
+    A fragment rerun executes only that function, never the top of app.py,
+    so it gets its own run labelled `fragment:<name>`. During a full rerun
+    the fragment body is just a span of the surrounding run.
+    """
+    label = f"fragment:{name}"
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if getattr(_local, 'run', None) is not None:
+                with span(label):
+                    return fn(*args, **kwargs)
+            begin_run(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end_run()
+        return run
+    return wrap
+
+
+def runs():
+    with _lock:
+        return list(_runs)
+
+
+def span_stats(recent=None):
+    """Per span name: count, mean, p50, p95 and max ms over the buffered reruns
+    (plus a `<label> (total)` row per run kind: full reruns and each fragment)."""
+    by_name = {}
+    for run in runs()[-recent:] if recent else runs():
+        for s in run['spans']:
+            by_name.setdefault(s['name'], []).append(s['ms'])
+        by_name.setdefault(f"{run['label']} (total)", []).append(run['total_ms'])
+    stats = {}
+    for name, values in by_name.items():
+        values = np.asarray(values)
+        stats[name] = {
+            'count':  len(values),
+            'mean':   float(values.mean()),
+            'p50':    float(np.percentile(values, 50)),
+            'p95':    float(np.percentile(values, 95)),
+            'max':    float(values.max()),
+        }
+    return stats
+
+
+def dump_jsonl(path=JSONL_PATH):
+    """Append reruns not yet written to a JSON-lines file; returns how many were written."""
+    global _dumped
+    with _lock:
+        pending = [r for r in _runs if r['id'] > _dumped]
+        if pending:
+            _dumped = pending[-1]['id']
+    if pending:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a') as f:
+            for run in pending:
+                f.write(json.dumps(run) + '\n')
+    return len(pending)
+
+
+def dump_prometheus(path=PROM_PATH, prefix='eduinsight'):
+    """Write span latency summaries in Prometheus text format (for node_exporter's textfile collector)."""
+    stats = span_stats()
+    lines = [f"# HELP {prefix}_span_milliseconds Streamlit rerun section latency",
+             f"# TYPE {prefix}_span_milliseconds summary"]
+    for name, s in sorted(stats.items()):
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        for q, key in (('0.5', 'p50'), ('0.95', 'p95')):
+            lines.append(f'{prefix}_span_milliseconds{{span="{label}",quantile="{q}"}} {s[key]:.3f}')
+        lines.append(f'{prefix}_span_milliseconds_sum{{span="{label}"}} {s["mean"] * s["count"]:.3f}')
+        lines.append(f'{prefix}_span_milliseconds_count{{span="{label}"}} {s["count"]}')
+    lines += [f"# HELP {prefix}_rss_bytes Resident memory of the app process",
+              f"# TYPE {prefix}_rss_bytes gauge",
+              f"{prefix}_rss_bytes {_rss()}"]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp, path)
+    return path
+
+
+def clear():
+    global _dumped
+    with _lock:
+        _runs.clear()
+        _dumped = _next_id
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PREDICT_CACHE_SIZE = 100_000   # memoized rows across all models
+
+# Process-wide LRU: (model_version, input tuple) -> prediction
+_lock  = threading.Lock()
+_cache = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def cached_predict(predict, version, X, maxsize=PREDICT_CACHE_SIZE):
+    """`predict(X)` with per-row memoization keyed by `(version, row)`.
+
+    Rows already seen for this model version are answered from the cache;
+    the remaining ones are scored together in a single `predict` call.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    keys = [(version, tuple(row)) for row in X.tolist()]
+    out = np.empty(len(keys))
+    missing = []
+
+    with _lock:
+        for i, key in enumerate(keys):
+            value = _cache.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                _cache.move_to_end(key)
+                out[i] = value
+        _stats['hits'] += len(keys) - len(missing)
+        _stats['misses'] += len(missing)
+
+    if missing:
+        preds = np.asarray(predict(X[missing]), dtype=np.float64)
+        out[missing] = preds
+        with _lock:
+            for i, value in zip(missing, preds.tolist()):
+                _cache[keys[i]] = value
+            while len(_cache) > maxsize:
+                _cache.popitem(last=False)
+                _stats['evictions'] += 1
+    return out
+
+
+class CachedModel:
+    """Wraps a fitted model so `.predict` goes through the process-wide cache."""
+
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+
+    def predict(self, X):
+        return cached_predict(self.model.predict, self.version, X)
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, evictions=0)
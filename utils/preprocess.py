@@ -1,34 +1,108 @@
+import os
+
+import joblib
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-
-def preprocess_data(df):
-    df = df.copy()
-
-    # 1. Handle Missing Values
-    df['Teacher_Quality'] = df['Teacher_Quality'].fillna('Medium')
-    df['Parental_Education_Level'] = df['Parental_Education_Level'].fillna('High School')
-    df['Distance_from_Home'] = df['Distance_from_Home'].fillna('Moderate')
-
-    # 2. Encode Categorical Variables
-    le = LabelEncoder()
-    categorical_cols = [
-        'Parental_Involvement', 'Access_to_Resources', 'Motivation_Level',
-        'Gender', 'Extracurricular_Activities', 'Internet_Access',
-        'Family_Income', 'Teacher_Quality', 'School_Type', 'Peer_Influence',
-        'Learning_Disabilities', 'Parental_Education_Level', 'Distance_from_Home'
-    ]
-    for col in categorical_cols:
-        if col in df.columns:
-            df[col] = le.fit_transform(df[col].astype(str))
-
-    # 3. Core features for attendance & performance correlation
-    features = [
-        'Attendance',
-        'Hours_Studied',
-        'Previous_Scores',
-        'Tutoring_Sessions',
-    ]
 
+CATEGORICAL_COLS = [
+    'Parental_Involvement', 'Access_to_Resources', 'Motivation_Level',
+    'Gender', 'Extracurricular_Activities', 'Internet_Access',
+    'Family_Income', 'Teacher_Quality', 'School_Type', 'Peer_Influence',
+    'Learning_Disabilities', 'Parental_Education_Level', 'Distance_from_Home'
+]
+
+# Core features for attendance & performance correlation
+FEATURES = [
+    'Attendance',
+    'Hours_Studied',
+    'Previous_Scores',
+    'Tutoring_Sessions',
+]
+
+# Missing-value fills for categoricals
+CATEGORICAL_FILLS = {
+    'Teacher_Quality':          'Medium',
+    'Parental_Education_Level': 'High School',
+    'Distance_from_Home':       'Moderate',
+}
+
+PREPROCESSOR_PATH = 'model/preprocessor.joblib'
+
+
+class Preprocessor:
+    """The training-time transform, fitted once and saved next to the model.
+
+    Holds the feature order, a fill value per feature and a fixed
+    vocabulary for each categorical feature (sorted, so codes match the
+    LabelEncoder encoding used before). Only columns in `features` are
+    fitted; with today's all-numeric FEATURES there are no vocabularies. `transform` never refits: values missing from a
+    vocabulary encode as -1, so any frame or chunk of one gets exactly the
+    training encoding.
+    """
+
+    def __init__(self, vocabularies, fill_values, features=FEATURES):
+        self.vocabularies = vocabularies
+        self.fill_values  = fill_values
+        self.features     = list(features)
+
+    def encode(self, series):
+        """Integer codes for one column (categoricals by vocabulary, numerics filled)."""
+        fill = self.fill_values.get(series.name)
+        if series.name in self.vocabularies:
+            values = series.astype(object)
+            if fill is not None:
+                values = values.where(values.notna(), fill)
+            return pd.Categorical(values.astype(str), categories=self.vocabularies[series.name]).codes
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if fill is not None:
+            values = np.where(np.isnan(values), fill, values)
+        return values
+
+    def transform(self, df):
+        """Feature frame for `df`, in training feature order."""
+        return pd.DataFrame({col: self.encode(df[col]) for col in self.features}, index=df.index)
+
+    def vector(self, values):
+        """A single `{feature: value}` row as a (1, n_features) array, skipping pandas."""
+        row = [values.get(col) for col in self.features]
+        return np.array([[self.fill_values.get(col, np.nan) if v is None else v
+                          for col, v in zip(self.features, row)]], dtype=np.float64)
+
+
+def fit_preprocessor(df, features=FEATURES):
+    vocabularies = {}
+    fill_values = {col: v for col, v in CATEGORICAL_FILLS.items() if col in features}
+    for col in CATEGORICAL_COLS:
+        if col in features and col in df.columns:
+            values = df[col].astype(object)
+            if col in fill_values:
+                values = values.where(values.notna(), fill_values[col])
+            vocabularies[col] = sorted(values.astype(str).unique())
+    for col in features:
+        if col not in vocabularies:
+            fill_values[col] = float(pd.to_numeric(df[col]).median())
+    return Preprocessor(vocabularies, fill_values, features)
+
+
+def save_preprocessor(preprocessor, path=PREPROCESSOR_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(preprocessor, tmp)
+    os.replace(tmp, path)
+
+
+def load_preprocessor(path=PREPROCESSOR_PATH):
+    return joblib.load(path)
+
+
+def preprocess_data(df, preprocessor=None):
+    """Features (and `Exam_Score` if present) for `df`.
+
+    Pass the saved `preprocessor` to reuse the training-time transform;
+    without one it is fitted on `df` itself.
+    """
+    if preprocessor is None:
+        preprocessor = fit_preprocessor(df)
+    X = preprocessor.transform(df)
     if 'Exam_Score' in df.columns:
-        return df[features], df['Exam_Score']
-    return df[features]
\ No newline at end of file
+        return X, df['Exam_Score']
+    return X
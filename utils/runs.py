@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+RUNS_DIR = 'model/runs'
+META     = 'meta.json'   # written last, so a run directory without it is incomplete
+
+
+def run_key(data_hash, preprocess_config, family, params, split):
+    """Content address of a training run: same inputs → same key → same artifacts."""
+    raw = json.dumps({
+        'data':       data_hash,
+        'preprocess': preprocess_config,
+        'family':     family,
+        'params':     params,
+        'split':      split,
+    }, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def run_dir(key, root=RUNS_DIR):
+    return os.path.join(root, key[:16])
+
+
+def load_meta(key, root=RUNS_DIR):
+    """Metadata of a finished run for `key`, or None."""
+    path = os.path.join(run_dir(key, root), META)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        meta = json.load(f)
+    return meta if meta.get('key') == key else None
+
+
+def save_meta(key, meta, root=RUNS_DIR):
+    path = os.path.join(run_dir(key, root), META)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(dict(meta, key=key, created=time.strftime('%Y-%m-%dT%H:%M:%S')), f, indent=2)
+    os.replace(tmp, path)
+
+
+def publish(src, dst):
+    """Atomically copy a run artifact to where the app loads it from."""
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def what_if(predict, base, changes):
+    """Score the base row and every perturbed copy of it in a single `predict` call.
+
+    `changes` is a list of `(label, {feature_index: new_value})`. Returns a
+    dict `{'Current': ..., label: ...}` in the order given.
+    """
+    rows = [list(base)]
+    for _, updates in changes:
+        row = list(base)
+        for i, value in updates.items():
+            row[i] = value
+        rows.append(row)
+    preds = predict(np.asarray(rows, dtype=np.float64))
+    labels = ['Current'] + [label for label, _ in changes]
+    return dict(zip(labels, (float(p) for p in preds)))
+
+
+def sweep(predict, base, x_index, x_values, y_index, y_values):
+    """Response surface over two features, every grid point scored in one batch.
+
+    All other features stay at `base`. Returns a `(len(y_values), len(x_values))`
+    array, so `surface[j, i]` is the prediction at `(x_values[i], y_values[j])`.
+    """
+    xx, yy = np.meshgrid(np.asarray(x_values, dtype=np.float64), np.asarray(y_values, dtype=np.float64))
+    grid = np.tile(np.asarray(base, dtype=np.float64), (xx.size, 1))
+    grid[:, x_index] = xx.ravel()
+    grid[:, y_index] = yy.ravel()
+    return np.asarray(predict(grid)).reshape(xx.shape)
@@ -0,0 +1,72 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.dataset import CACHE_DIR, prune_siblings
+from utils.preprocess import preprocess_data
+
+SCORE_CHUNK = 100_000   # rows per predict() call
+
+# Same rules as the Grade Estimator's risk badge
+RISK_TIERS = ['Critical', 'At Risk', 'Needs Attention', 'On Track']
+
+
+def risk_codes(attendance, predicted):
+    """Vectorized risk tier codes (indexes into RISK_TIERS)."""
+    att  = np.asarray(attendance)
+    pred = np.asarray(predicted)
+    return np.select([att < 60, att < 75, pred < 55], [0, 1, 2], default=3).astype(np.int8)
+
+
+def risk_tier(attendance, predicted):
+    return pd.Categorical.from_codes(risk_codes(attendance, predicted), RISK_TIERS)
+
+
+def predict_chunked(model, X, chunk_rows=SCORE_CHUNK):
+    """`model.predict` over `X` in slices of `chunk_rows`, as one float32 array."""
+    X = np.asarray(X)
+    out = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), chunk_rows):
+        out[start:start + chunk_rows] = model.predict(X[start:start + chunk_rows])
+    return out
+
+
+def score_frame(model, df, chunk_rows=SCORE_CHUNK, preprocessor=None):
+    """Predicted score and risk tier for every row of `df`."""
+    features = preprocess_data(df, preprocessor)
+    X = features[0] if isinstance(features, tuple) else features
+    predicted = predict_chunked(model, X.to_numpy(dtype=np.float64), chunk_rows)
+    return {
+        'Predicted_Score': predicted,
+        'Risk_Code':       risk_codes(X['Attendance'].to_numpy(), predicted),
+    }
+
+
+def as_frame(scores):
+    return pd.DataFrame({
+        'Predicted_Score': scores['Predicted_Score'],
+        'Risk_Tier':       pd.Categorical.from_codes(scores['Risk_Code'], RISK_TIERS),
+    })
+
+
+def scores_path(model_version, data_version):
+    return os.path.join(CACHE_DIR, f"scores_{model_version[:16]}_{data_version[:16]}.joblib")
+
+
+def load_or_score(model_version, data_version, load_model, load_df, preprocessor=None):
+    """Persisted cohort scores for this model + data version, scoring on a miss."""
+    path = scores_path(model_version, data_version)
+    if os.path.exists(path):
+        try:
+            return joblib.load(path, mmap_mode='r')
+        except Exception:
+            pass
+    scores = score_frame(load_model(), load_df(), preprocessor=preprocessor)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(scores, tmp)
+    os.replace(tmp, path)
+    prune_siblings(path, 'scores_*.joblib')
+    return scores
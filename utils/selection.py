@@ -0,0 +1,191 @@
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.dataset import CACHE_DIR
+
+SELECTION_DIR  = os.path.join(CACHE_DIR, 'selection')   # one JSON result per evaluated candidate
+CV_FOLDS       = 5
+LATENCY_ROWS   = 50    # single-row predictions timed per candidate
+LATENCY_WEIGHT = 0.0   # objective penalty per ms of single-row latency (0 = accuracy only)
+FINALISTS      = 5     # best candidates re-timed one at a time once the pool is done
+
+# Model families and hyperparameter grids; every combination is one candidate.
+# Estimators are named by import path so workers import them lazily.
+SEARCH_SPACE = {
+    'sklearn.ensemble.RandomForestRegressor': {
+        'n_estimators': [100, 200],
+        'max_depth':    [8, 10],
+        'random_state': [42],
+    },
+    'sklearn.ensemble.GradientBoostingRegressor': {
+        'n_estimators':  [100, 300],
+        'max_depth':     [2, 3],
+        'learning_rate': [0.05, 0.1],
+        'random_state':  [42],
+    },
+    'sklearn.ensemble.HistGradientBoostingRegressor': {
+        'max_iter':       [100, 300],
+        'learning_rate':  [0.05, 0.1],
+        'max_leaf_nodes': [15, 31],
+        'random_state':   [42],
+    },
+    'sklearn.linear_model.Ridge': {
+        'alpha': [0.1, 1.0, 10.0],
+    },
+}
+
+
+def build_model(family, params, n_jobs=None):
+    module, name = family.rsplit('.', 1)
+    model = getattr(importlib.import_module(module), name)(**params)
+    if n_jobs is not None and 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    return model
+
+
+def candidates(space=SEARCH_SPACE):
+    """Expand the search space into `(family, params)` pairs."""
+    for family, grid in space.items():
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            yield family, dict(zip(keys, values))
+
+
+def candidate_key(data_hash, family, params, folds, seed):
+    raw = json.dumps([data_hash, family, params, folds, seed], sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _result_path(key):
+    return os.path.join(SELECTION_DIR, f"{key}.json")
+
+
+def _latency(model, rows, batch):
+    """Median single-row predict time (the estimator) and per-row time of one batch (scoring)."""
+    times = []
+    for row in rows:
+        t0 = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        times.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    model.predict(batch)
+    batch_s = time.perf_counter() - t0
+    return {
+        'row_ms':   float(np.median(times) * 1e3),
+        'batch_us': float(batch_s / len(batch) * 1e6),   # per row
+    }
+
+
+def evaluate(X, y, family, params, folds=CV_FOLDS, seed=42):
+    """k-fold R² / MAE plus fit time and predict latency for one candidate."""
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import KFold
+
+    r2s, maes, fit_s = [], [], []
+    for train_idx, test_idx in KFold(folds, shuffle=True, random_state=seed).split(X):
+        model = build_model(family, params, n_jobs=1)   # parallelism comes from the process pool
+        t0 = time.perf_counter()
+        model.fit(X[train_idx], y[train_idx])
+        fit_s.append(time.perf_counter() - t0)
+        pred = model.predict(X[test_idx])
+        r2s.append(r2_score(y[test_idx], pred))
+        maes.append(mean_absolute_error(y[test_idx], pred))
+
+    # Latency of the last fold's model (provisional: other candidates share the CPU meanwhile)
+    return {
+        'family':         family,
+        'params':         params,
+        'r2':             float(np.mean(r2s)),
+        'r2_std':         float(np.std(r2s)),
+        'mae':            float(np.mean(maes)),
+        'fit_s':          float(np.mean(fit_s)),
+        **_latency(model, X[test_idx[:LATENCY_ROWS]], X[test_idx]),
+    }
+
+
+def retime(X, y, family, params, folds=CV_FOLDS, seed=42):
+    """Latency of one candidate refit on the last CV fold, measured with nothing else running."""
+    from sklearn.model_selection import KFold
+
+    train_idx, test_idx = list(KFold(folds, shuffle=True, random_state=seed).split(X))[-1]
+    model = build_model(family, params, n_jobs=1).fit(X[train_idx], y[train_idx])
+    return _latency(model, X[test_idx[:LATENCY_ROWS]], X[test_idx])
+
+
+def objective(result, metric='r2', latency_weight=LATENCY_WEIGHT):
+    """Higher is better: R² (or −MAE) minus `latency_weight` per ms of single-row latency."""
+    accuracy = result['r2'] if metric == 'r2' else -result['mae']
+    return accuracy - latency_weight * result['row_ms']
+
+
+def _save(path, result):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({k: v for k, v in result.items() if k not in ('cached', 'objective')}, f)
+    os.replace(tmp, path)
+
+
+def select(X, y, data_hash, space=SEARCH_SPACE, folds=CV_FOLDS, seed=42, workers=None,
+           metric='r2', latency_weight=LATENCY_WEIGHT, finalists=FINALISTS):
+    """Evaluate every candidate (cached ones are read back) and rank them by `objective`.
+
+    Latencies timed inside the pool are skewed by the candidates fitting
+    alongside, so the `finalists` best by accuracy and by objective are
+    re-timed one at a time afterwards (and the new timings cached) before
+    the final ranking. Returns the results sorted best first; each carries
+    its `objective` value and whether it came from the cache.
+    """
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    results, pending = [], []
+    for family, params in candidates(space):
+        path = _result_path(candidate_key(data_hash, family, params, folds, seed))
+        if os.path.exists(path):
+            with open(path) as f:
+                results.append(dict(json.load(f), cached=True))
+        else:
+            pending.append((path, family, params))
+
+    if pending:
+        os.makedirs(SELECTION_DIR, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(path, pool.submit(evaluate, X, y, family, params, folds, seed))
+                       for path, family, params in pending]
+            for path, future in futures:
+                result = future.result()
+                _save(path, result)
+                results.append(dict(result, cached=False))
+
+    by_accuracy  = sorted(results, key=lambda r: objective(r, metric, 0), reverse=True)
+    by_objective = sorted(results, key=lambda r: objective(r, metric, latency_weight), reverse=True)
+    for result in {id(r): r for r in by_accuracy[:finalists] + by_objective[:finalists]}.values():
+        if not result.get('retimed'):
+            result.update(retime(X, y, result['family'], result['params'], folds, seed), retimed=True)
+            _save(_result_path(candidate_key(data_hash, result['family'], result['params'], folds, seed)),
+                  result)
+
+    for result in results:
+        result['objective'] = objective(result, metric, latency_weight)
+    return sorted(results, key=lambda r: r['objective'], reverse=True)
+
+
+def report(results, top=10):
+    """Ranked table, one line of metrics per candidate with its full params underneath.
+
+    Latencies marked `*` are provisional (timed under pool contention).
+    """
+    print(f"{'model':<22} {'R²':>7} {'MAE':>6} {'fit s':>7} {'row ms':>8} {'µs/row':>7} {'score':>8}")
+    for r in results[:top]:
+        name = r['family'].rsplit('.', 1)[1].replace('Regressor', '')
+        params = ', '.join(f"{k}={v}" for k, v in r['params'].items() if k != 'random_state')
+        mark = ' ' if r.get('retimed') else '*'
+        print(f"{name:<22} {r['r2']:>7.4f} {r['mae']:>6.2f} {r['fit_s']:>7.2f} "
+              f"{r['row_ms']:>7.2f}{mark} {r['batch_us']:>7.1f} {r['objective']:>8.4f}"
+              f"{'  (cached)' if r['cached'] else ''}")
+        print(f"    {params or '(defaults)'}")
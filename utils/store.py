@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+
+import joblib
+
+from utils import name_index, perf, scoring, summary
+from utils.attendance_index import AttendanceIndex
+from utils.dataset import CSV_PATH, dataset_version, file_hash, load_dataset
+from utils.flat_forest import FLAT_PATH
+from utils.grid_model import GRID_PATH, GRID_TOLERANCE
+from utils.preprocess import PREPROCESSOR_PATH
+
+MODEL_PATH = 'model/model.pkl'
+
+# Process-wide state. Streamlit re-executes app.py on every rerun but keeps
+# imported modules alive, so everything held here is shared by every rerun
+# and every session served by this process.
+_lock      = threading.RLock()
+_frames    = {}   # (csv_path, version, columns) -> DataFrame
+_models    = {}   # (path, mmap_mode)            -> (fingerprint, estimator)
+_summaries = {}   # csv_path                     -> dashboard summary snapshot
+_indexes   = {}   # (kind, csv_path)             -> (version, index)
+_hashes    = {}   # path                         -> (fingerprint, sha1)
+_scores    = {}   # (csv_path, model_path)       -> ((data_version, model_version), scores)
+_timings   = {}   # resource name                -> seconds taken by its last load
+
+
+def _timed(name, fn):
+    t0 = time.perf_counter()
+    with perf.span(f"load:{name}"):
+        result = fn()
+    _timings[name] = time.perf_counter() - t0
+    return result
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def get_dataset(columns=None, csv_path=CSV_PATH):
+    """Return the shared student DataFrame (optionally only `columns`).
+
+    The frame is loaded once per dataset version and reused afterwards, so
+    callers must treat it as read-only and `.copy()` before mutating.
+    """
+    version = dataset_version(csv_path)
+    key = (csv_path, version, tuple(columns) if columns is not None else None)
+    with _lock:
+        df = _frames.get(key)
+        if df is None:
+            for stale in [k for k in _frames if k[0] == csv_path and k[1] != version]:
+                del _frames[stale]
+            label = 'dataset' if columns is None else f"dataset[{len(columns)} cols]"
+            df = _timed(label, lambda: load_dataset(columns, csv_path))
+            _frames[key] = df
+        return df
+
+
+def get_model(path=MODEL_PATH, mmap_mode='r'):
+    """Return the shared model, reloading only when the file on disk changes.
+
+    `mmap_mode='r'` only helps objects that keep the numpy arrays joblib
+    hands them (the flat forest, the prediction grid): those pages are shared
+    between workers via the OS page cache. sklearn trees copy their node
+    arrays into private buffers on unpickling, so a RandomForest pickle costs
+    every process its full size regardless.
+    """
+    fingerprint = _fingerprint(path)
+    key = (path, mmap_mode)
+    with _lock:
+        cached = _models.get(key)
+        if cached is None or cached[0] != fingerprint:
+            model = _timed(f"model:{os.path.basename(path)}",
+                           lambda: joblib.load(path, mmap_mode=mmap_mode))
+            cached = (fingerprint, model)
+            _models[key] = cached
+        return cached[1]
+
+
+def get_flat_model(path=FLAT_PATH, model_path=MODEL_PATH):
+    """The compiled flat-array forest (utils/flat_forest.py), or None if missing/stale.
+
+    Its arrays are memory-mapped, so every worker process shares one copy.
+    """
+    if not os.path.exists(path) or not os.path.exists(model_path):
+        return None
+    flat = get_model(path, mmap_mode='r')
+    return flat if flat.source == model_version(model_path) else None
+
+
+def get_grid_model(path=GRID_PATH, model_path=MODEL_PATH, tolerance=GRID_TOLERANCE):
+    """The precomputed prediction lattice (utils/grid_model.py), or None if missing/stale.
+
+    A coarse (interpolating) grid is only returned when its measured max
+    error is within `tolerance` marks; otherwise callers fall back to the
+    exact model.
+    """
+    if not os.path.exists(path) or not os.path.exists(model_path):
+        return None
+    grid = get_model(path, mmap_mode='r')
+    if grid.source != model_version(model_path) or not grid.within(tolerance):
+        return None
+    return grid
+
+
+def get_preprocessor(path=PREPROCESSOR_PATH):
+    """The fitted preprocessing saved with the model (None for models trained before it existed)."""
+    if not os.path.exists(path):
+        return None
+    return get_model(path, mmap_mode=None)
+
+
+def model_version(path=MODEL_PATH):
+    """Content hash of a model file, recomputed only when the file changes."""
+    fingerprint = _fingerprint(path)
+    with _lock:
+        cached = _hashes.get(path)
+        if cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, file_hash(path))
+            _hashes[path] = cached
+        return cached[1]
+
+
+def get_summary(csv_path=CSV_PATH):
+    """Return the precomputed dashboard summary for the current dataset version."""
+    version = dataset_version(csv_path)
+    with _lock:
+        cached = _summaries.get(csv_path)
+        if cached is None or cached['version'] != version:
+            cached = _timed('summary', lambda: summary.load_or_compute(
+                version, lambda: get_dataset(csv_path=csv_path), csv_path))
+            _summaries[csv_path] = cached
+        return cached
+
+
+def _get_index(kind, csv_path, build):
+    version = dataset_version(csv_path)
+    key = (kind, csv_path)
+    with _lock:
+        cached = _indexes.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, _timed(kind, lambda: build(version)))
+            _indexes[key] = cached
+        return cached[1]
+
+
+def get_name_index(csv_path=CSV_PATH):
+    """Trigram index over `Name` for the current dataset version (None if there is no Name column)."""
+    def build(version):
+        names = get_dataset(['Name'], csv_path)
+        if 'Name' not in names.columns:
+            return None
+        return name_index.load_or_build(version, lambda: names['Name'])
+    return _get_index('name_index', csv_path, build)
+
+
+def get_attendance_index(csv_path=CSV_PATH):
+    """Attendance/Exam_Score sort index for the current dataset version."""
+    return _get_index('attendance_index', csv_path, lambda version: AttendanceIndex(
+        get_dataset(['Attendance', 'Exam_Score', 'Gender'], csv_path)))
+
+
+def get_scores(csv_path=CSV_PATH, model_path=MODEL_PATH):
+    """Predicted score + risk tier for every student (None until a model is trained).
+
+    Scored once per (model, dataset) version and persisted, so the portal and
+    explorer can sort/filter on predictions without running the model.
+    """
+    if not os.path.exists(model_path):
+        return None
+    versions = (dataset_version(csv_path), model_version(model_path))
+    key = (csv_path, model_path)
+    with _lock:
+        cached = _scores.get(key)
+        if cached is None or cached[0] != versions:
+            scores = _timed('scores', lambda: scoring.as_frame(scoring.load_or_score(
+                versions[1], versions[0],
+                lambda: get_model(model_path), lambda: get_dataset(csv_path=csv_path),
+                get_preprocessor())))
+            cached = (versions, scores)
+            _scores[key] = cached
+        return cached[1]
+
+
+def timings():
+    """Seconds spent on the most recent load of each resource."""
+    with _lock:
+        return dict(_timings)
+
+
+def clear():
+    """Drop every cached object (used by benchmarks and tests)."""
+    with _lock:
+        _frames.clear()
+        _models.clear()
+        _summaries.clear()
+        _indexes.clear()
+        _hashes.clear()
+        _scores.clear()
+        _timings.clear()
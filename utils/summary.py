@@ -0,0 +1,55 @@
+import json
+import os
+
+import pandas as pd
+
+from utils import aggregates
+from utils.dataset import CACHE_DIR, prune_siblings
+
+
+def compute_summary(df, version=None):
+    """Every dashboard KPI and chart input, computed in one pass over `df`.
+
+    Means and the full correlation matrix come from a single cross-product
+    `X.T @ X`; band means and histograms from `np.bincount` value counts
+    (see utils/aggregates.py). The result is plain lists/floats so it can be
+    stored as JSON.
+    """
+    return aggregates.RunningAggregates.from_frame(df).summary(version)
+
+
+def corr_frame(summary):
+    """The stored correlation matrix as a labelled DataFrame (for the heatmap)."""
+    cm = summary['corr_matrix']
+    return pd.DataFrame(cm['values'], index=cm['columns'], columns=cm['columns'])
+
+
+def snapshot_path(version):
+    return os.path.join(CACHE_DIR, f"summary_{version[:16]}.json")
+
+
+def load_or_compute(version, load_df, csv_path=None):
+    """Read the persisted snapshot for `version`, computing (and saving) it if missing.
+
+    `load_df` is only called on a miss. When `csv_path` is given the running
+    aggregates for that file are brought up to date instead, so rows appended
+    to or edited in the CSV cost O(changed rows) rather than a full recompute.
+    """
+    path = snapshot_path(version)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if csv_path is not None:
+        summary = aggregates.refresh(csv_path, version, load_df).summary(version)
+    else:
+        summary = compute_summary(load_df(), version)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(summary, f)
+    os.replace(tmp, path)
+    prune_siblings(path, 'summary_*.json')
+    return summary
@@ -0,0 +1,94 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import CSV_PATH
+from utils.export import iter_csv, iter_gzip, write_parquet
+
+SYNTH_CHUNK = 100_000   # rows generated at a time (bounds memory for any cohort size)
+
+# Exam_Score is generated from these; every other column is drawn from its own marginal
+SCORE_DRIVERS = ['Attendance', 'Hours_Studied', 'Previous_Scores']
+
+
+class CohortModel:
+    """What the generator learns from the real CSV.
+
+    Per column: the empirical value distribution (including its missing
+    share), with numeric values sampled at their observed frequencies.
+    Exam_Score is a least-squares fit on SCORE_DRIVERS plus a residual drawn
+    from the real residuals, clipped to the observed range. Names combine
+    real first and last names independently. Columns other than the score
+    are sampled independently of each other.
+    """
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.marginals = {}
+        for col in self.columns:
+            if col in ('Name', 'Exam_Score'):
+                continue
+            counts = df[col].value_counts(dropna=False, normalize=True)
+            self.marginals[col] = (counts.index.to_numpy(), counts.to_numpy(), df[col].dtype)
+
+        X = np.column_stack([df[SCORE_DRIVERS].to_numpy(dtype=np.float64), np.ones(len(df))])
+        y = df['Exam_Score'].to_numpy(dtype=np.float64)
+        self.coef = np.linalg.lstsq(X, y, rcond=None)[0]
+        self.residuals = y - X @ self.coef
+        self.score_range = (y.min(), y.max())
+
+        names = df['Name'].dropna().str.split(' ', n=1) if 'Name' in df.columns else None
+        self.first_names = names.str[0].unique() if names is not None else None
+        self.last_names = names.str[1].dropna().unique() if names is not None else None
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_PATH):
+        return cls(pd.read_csv(csv_path))
+
+    def sample(self, n, rng):
+        """One DataFrame of `n` synthetic students, in the real column order."""
+        data = {}
+        for col, (values, probs, dtype) in self.marginals.items():
+            drawn = values[rng.choice(len(values), size=n, p=probs)]
+            data[col] = drawn.astype(dtype) if pd.api.types.is_numeric_dtype(dtype) else drawn
+
+        X = np.column_stack([data[c].astype(np.float64) for c in SCORE_DRIVERS] + [np.ones(n)])
+        score = X @ self.coef + self.residuals[rng.integers(0, len(self.residuals), n)]
+        data['Exam_Score'] = np.clip(np.rint(score), *self.score_range).astype(np.int64)
+
+        if self.first_names is not None:
+            first = self.first_names[rng.integers(0, len(self.first_names), n)]
+            last = self.last_names[rng.integers(0, len(self.last_names), n)]
+            data['Name'] = np.char.add(np.char.add(first.astype(str), ' '), last.astype(str))
+        return pd.DataFrame({col: data[col] for col in self.columns})
+
+    def generate(self, n, chunk_rows=SYNTH_CHUNK, seed=0):
+        """Yield `n` students as consecutive DataFrames of at most `chunk_rows`."""
+        rng = np.random.default_rng(seed)
+        for start in range(0, n, chunk_rows):
+            yield self.sample(min(chunk_rows, n - start), rng)
+
+
+def write_cohort(model, n, path, chunk_rows=SYNTH_CHUNK, seed=0):
+    """Stream a synthetic cohort to `path` (.csv, .csv.gz or .parquet) chunk by chunk."""
+    frames = model.generate(n, chunk_rows, seed)
+    if path.endswith('.parquet'):
+        write_parquet(frames, path)
+        return path
+    pieces = iter_csv(frames)
+    if path.endswith('.gz'):
+        pieces = iter_gzip(pieces)
+    with open(path, 'wb') as f:
+        for piece in pieces:
+            f.write(piece)
+    return path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m utils.synth <rows> <out.csv|out.csv.gz|out.parquet> [seed]")
+        sys.exit(1)
+    rows, out = int(sys.argv[1]), sys.argv[2]
+    write_cohort(CohortModel.from_csv(), rows, out, seed=int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    print(f"✅ {rows:,} synthetic students written to {out}")